@@ -1,9 +1,19 @@
 from .config_flow import CryptoInfoData
 from .const.const import _LOGGER, DOMAIN
+from .services import async_setup_services
 
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import Platform
+from homeassistant.helpers import config_validation as cv
 
 PLATFORMS = [Platform.SENSOR]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass, config) -> bool:
+    """Set up the CryptoInfo services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass, entry) -> bool:
@@ -11,6 +21,7 @@ async def async_setup_entry(hass, entry) -> bool:
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = CryptoInfoData(hass)
         await hass.data[DOMAIN].async_initialize()
+    hass.data[DOMAIN].async_start_catalog_updates()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     _LOGGER.debug("__init__ set up")
@@ -26,4 +37,20 @@ async def async_unload_entry(hass, entry) -> bool:
     # Unload the sensor platform
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
 
+    if unload_ok and DOMAIN in hass.data:
+        loaded = [
+            other
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.state is ConfigEntryState.LOADED
+            and other.entry_id != entry.entry_id
+        ]
+        if not loaded:
+            hass.data[DOMAIN].async_stop_catalog_updates()
+
     return unload_ok
+
+
+async def async_remove_entry(hass, entry) -> None:
+    """Forget the stored state of a removed config entry."""
+    if DOMAIN in hass.data:
+        hass.data[DOMAIN].store.set_alert_state(entry.entry_id, None)
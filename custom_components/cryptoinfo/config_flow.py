@@ -13,14 +13,30 @@ from homeassistant import config_entries
 from homeassistant.helpers import config_validation as cv
 
 from .config_validation import precision as cv_precision
+from .config_validation import price_threshold as cv_price_threshold
+from .config_validation import statistics_windows as cv_statistics_windows
+from .config_validation import streaming_provider as cv_streaming_provider
+from .config_validation import price_alerts as cv_price_alerts
+from .config_validation import top_count as cv_top_count
+from .config_validation import adaptive_update_frequency as cv_adaptive_update_frequency
 from .const.const import (
     _LOGGER,
+    CONF_ADAPTIVE_UPDATE_FREQUENCY,
+    CONF_API_KEY,
     CONF_CRYPTOCURRENCY_IDS,
     CONF_CURRENCY_NAME,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_EXCLUDE_STATIC_ATTRIBUTES,
     CONF_ID,
     CONF_MIN_TIME_BETWEEN_REQUESTS,
     CONF_MULTIPLIERS,
+    CONF_PORTFOLIO,
     CONF_PRECISION,
+    CONF_PRICE_ALERTS,
+    CONF_PRICE_THRESHOLD,
+    CONF_STATISTICS_WINDOWS,
+    CONF_STREAMING_PROVIDER,
+    CONF_TOP_COUNT,
     CONF_UNIT_OF_MEASUREMENT,
     CONF_UPDATE_FREQUENCY,
     DOMAIN,
@@ -37,6 +53,14 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Validate the input."""
         errors = {}
 
+        # At least one currency, the first one is the base currency
+        if not any(name.strip() for name in user_input[CONF_CURRENCY_NAME].split(",")):
+            return {CONF_CURRENCY_NAME: "invalid_currency_name"}
+
+        # The ids and multipliers are not used when following the top coins
+        if user_input.get(CONF_TOP_COUNT):
+            return errors
+
         # Split and clean the values
         crypto_ids = [
             name.strip() for name in user_input[CONF_CRYPTOCURRENCY_IDS].split(",")
@@ -53,15 +77,56 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 },
             }
 
+        # Check the ids against the cached coin catalog, if there is one yet
+        catalog = self.hass.data[DOMAIN].catalog if DOMAIN in self.hass.data else None
+        if catalog:
+            unknown_ids = [
+                crypto_id
+                for crypto_id in crypto_ids
+                if crypto_id.lower() not in catalog
+            ]
+            if unknown_ids:
+                return {
+                    CONF_CRYPTOCURRENCY_IDS: "unknown_cryptocurrency_ids",
+                    "count_context": {
+                        "unknown_ids": ", ".join(unknown_ids),
+                        "suggestions": "; ".join(
+                            f"{crypto_id}: {', '.join(catalog.suggest(crypto_id)) or '-'}"
+                            for crypto_id in unknown_ids
+                        ),
+                    },
+                }
+
         return errors
 
-    def _precision_field_errors(self, user_input: dict[str, Any]) -> dict[str, str]:
-        """Validate CONF_PRECISION (UI schema must stay JSON-serializable)."""
+    def _text_field_errors(self, user_input: dict[str, Any]) -> dict[str, str]:
+        """Validate the optional text fields (UI schema must stay JSON-serializable)."""
         errors: dict[str, str] = {}
-        try:
-            user_input[CONF_PRECISION] = cv_precision(user_input.get(CONF_PRECISION, ""))
-        except vol.Invalid:
-            errors[CONF_PRECISION] = "invalid_precision"
+        for field, validator, error in (
+            (CONF_PRECISION, cv_precision, "invalid_precision"),
+            (CONF_PRICE_THRESHOLD, cv_price_threshold, "invalid_price_threshold"),
+            (
+                CONF_STATISTICS_WINDOWS,
+                cv_statistics_windows,
+                "invalid_statistics_windows",
+            ),
+            (
+                CONF_STREAMING_PROVIDER,
+                cv_streaming_provider,
+                "invalid_streaming_provider",
+            ),
+            (CONF_PRICE_ALERTS, cv_price_alerts, "invalid_price_alerts"),
+            (CONF_TOP_COUNT, cv_top_count, "invalid_top_count"),
+            (
+                CONF_ADAPTIVE_UPDATE_FREQUENCY,
+                cv_adaptive_update_frequency,
+                "invalid_adaptive_update_frequency",
+            ),
+        ):
+            try:
+                user_input[field] = validator(user_input.get(field, ""))
+            except vol.Invalid:
+                errors[field] = error
         return errors
 
     async def async_step_reconfigure(self, user_input: Mapping[str, Any] | None = None):
@@ -79,10 +144,22 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input[CONF_UNIT_OF_MEASUREMENT] = ""
             if CONF_PRECISION not in user_input:
                 user_input[CONF_PRECISION] = ""
-
-            prec_errors = self._precision_field_errors(user_input)
-            if prec_errors:
-                return await self._redo_configuration(entry.data, prec_errors)
+            if CONF_PRICE_THRESHOLD not in user_input:
+                user_input[CONF_PRICE_THRESHOLD] = ""
+            if CONF_STATISTICS_WINDOWS not in user_input:
+                user_input[CONF_STATISTICS_WINDOWS] = ""
+            if CONF_STREAMING_PROVIDER not in user_input:
+                user_input[CONF_STREAMING_PROVIDER] = ""
+            if CONF_PRICE_ALERTS not in user_input:
+                user_input[CONF_PRICE_ALERTS] = ""
+            if CONF_TOP_COUNT not in user_input:
+                user_input[CONF_TOP_COUNT] = ""
+            if CONF_ADAPTIVE_UPDATE_FREQUENCY not in user_input:
+                user_input[CONF_ADAPTIVE_UPDATE_FREQUENCY] = ""
+
+            field_errors = self._text_field_errors(user_input)
+            if field_errors:
+                return await self._redo_configuration(entry.data, field_errors)
 
             # Validate the input
             validation_result = self._validate_input(user_input)
@@ -93,10 +170,12 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
             # Update the shared data
+            api_key = user_input.pop(CONF_API_KEY, "").strip()
             if DOMAIN in self.hass.data:
                 self.hass.data[DOMAIN].min_time_between_requests = user_input[
                     CONF_MIN_TIME_BETWEEN_REQUESTS
                 ]
+                self.hass.data[DOMAIN].api_key = api_key
 
             # Create new data combining old entry data with new user input
             new_data = {**entry.data, **user_input}
@@ -127,8 +206,10 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         # Get value from shared data if available
         default_min_time = 0.25
+        default_api_key = ""
         if DOMAIN in self.hass.data:
             default_min_time = self.hass.data[DOMAIN].min_time_between_requests
+            default_api_key = self.hass.data[DOMAIN].api_key
 
         cryptoinfo_schema = vol.Schema(
             {
@@ -157,6 +238,60 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     default=entry_data.get(CONF_PRECISION, ""),
                     description={"suggested_value": entry_data.get(CONF_PRECISION, "")},
                 ): str,
+                vol.Optional(
+                    CONF_PRICE_THRESHOLD,
+                    default=entry_data.get(CONF_PRICE_THRESHOLD, ""),
+                    description={
+                        "suggested_value": entry_data.get(CONF_PRICE_THRESHOLD, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_EXCLUDE_STATIC_ATTRIBUTES,
+                    default=entry_data.get(CONF_EXCLUDE_STATIC_ATTRIBUTES, False),
+                ): bool,
+                vol.Optional(
+                    CONF_STATISTICS_WINDOWS,
+                    default=entry_data.get(CONF_STATISTICS_WINDOWS, ""),
+                    description={
+                        "suggested_value": entry_data.get(CONF_STATISTICS_WINDOWS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_DIAGNOSTIC_SENSORS,
+                    default=entry_data.get(CONF_DIAGNOSTIC_SENSORS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_STREAMING_PROVIDER,
+                    default=entry_data.get(CONF_STREAMING_PROVIDER, ""),
+                    description={
+                        "suggested_value": entry_data.get(CONF_STREAMING_PROVIDER, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_PORTFOLIO,
+                    default=entry_data.get(CONF_PORTFOLIO, False),
+                ): bool,
+                vol.Optional(
+                    CONF_PRICE_ALERTS,
+                    default=entry_data.get(CONF_PRICE_ALERTS, ""),
+                    description={
+                        "suggested_value": entry_data.get(CONF_PRICE_ALERTS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_TOP_COUNT,
+                    default=entry_data.get(CONF_TOP_COUNT, ""),
+                    description={"suggested_value": entry_data.get(CONF_TOP_COUNT, "")},
+                ): str,
+                vol.Optional(
+                    CONF_ADAPTIVE_UPDATE_FREQUENCY,
+                    default=entry_data.get(CONF_ADAPTIVE_UPDATE_FREQUENCY, ""),
+                    description={
+                        "suggested_value": entry_data.get(
+                            CONF_ADAPTIVE_UPDATE_FREQUENCY, ""
+                        )
+                    },
+                ): str,
                 vol.Required(
                     CONF_UPDATE_FREQUENCY, default=entry_data[CONF_UPDATE_FREQUENCY]
                 ): cv.positive_float,
@@ -164,6 +299,10 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_MIN_TIME_BETWEEN_REQUESTS,
                     description={"suggested_value": default_min_time},
                 ): cv.positive_float,
+                vol.Optional(
+                    CONF_API_KEY,
+                    description={"suggested_value": default_api_key},
+                ): str,
             }
         )
 
@@ -186,6 +325,7 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.hass.data[DOMAIN].async_initialize()
 
         default_min_time = self.hass.data[DOMAIN].min_time_between_requests
+        default_api_key = self.hass.data[DOMAIN].api_key
 
         # Use user_input values as defaults if they exist, otherwise use the original defaults
         defaults = {
@@ -196,7 +336,17 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             CONF_UNIT_OF_MEASUREMENT: "$",
             CONF_UPDATE_FREQUENCY: 1,
             CONF_MIN_TIME_BETWEEN_REQUESTS: default_min_time,
+            CONF_API_KEY: default_api_key,
             CONF_PRECISION: "",
+            CONF_PRICE_THRESHOLD: "",
+            CONF_EXCLUDE_STATIC_ATTRIBUTES: False,
+            CONF_STATISTICS_WINDOWS: "",
+            CONF_DIAGNOSTIC_SENSORS: False,
+            CONF_STREAMING_PROVIDER: "",
+            CONF_PORTFOLIO: False,
+            CONF_PRICE_ALERTS: "",
+            CONF_TOP_COUNT: "",
+            CONF_ADAPTIVE_UPDATE_FREQUENCY: "",
         }
 
         # Update defaults with user input if it exists
@@ -228,6 +378,60 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     default="",
                     description={"suggested_value": defaults.get(CONF_PRECISION, "")},
                 ): str,
+                vol.Optional(
+                    CONF_PRICE_THRESHOLD,
+                    default="",
+                    description={
+                        "suggested_value": defaults.get(CONF_PRICE_THRESHOLD, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_EXCLUDE_STATIC_ATTRIBUTES,
+                    default=defaults[CONF_EXCLUDE_STATIC_ATTRIBUTES],
+                ): bool,
+                vol.Optional(
+                    CONF_STATISTICS_WINDOWS,
+                    default=defaults[CONF_STATISTICS_WINDOWS],
+                    description={
+                        "suggested_value": defaults.get(CONF_STATISTICS_WINDOWS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_DIAGNOSTIC_SENSORS,
+                    default=defaults[CONF_DIAGNOSTIC_SENSORS],
+                ): bool,
+                vol.Optional(
+                    CONF_STREAMING_PROVIDER,
+                    default=defaults[CONF_STREAMING_PROVIDER],
+                    description={
+                        "suggested_value": defaults.get(CONF_STREAMING_PROVIDER, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_PORTFOLIO,
+                    default=defaults[CONF_PORTFOLIO],
+                ): bool,
+                vol.Optional(
+                    CONF_PRICE_ALERTS,
+                    default=defaults[CONF_PRICE_ALERTS],
+                    description={
+                        "suggested_value": defaults.get(CONF_PRICE_ALERTS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_TOP_COUNT,
+                    default=defaults[CONF_TOP_COUNT],
+                    description={"suggested_value": defaults.get(CONF_TOP_COUNT, "")},
+                ): str,
+                vol.Optional(
+                    CONF_ADAPTIVE_UPDATE_FREQUENCY,
+                    default=defaults[CONF_ADAPTIVE_UPDATE_FREQUENCY],
+                    description={
+                        "suggested_value": defaults.get(
+                            CONF_ADAPTIVE_UPDATE_FREQUENCY, ""
+                        )
+                    },
+                ): str,
                 vol.Required(
                     CONF_UPDATE_FREQUENCY, default=defaults[CONF_UPDATE_FREQUENCY]
                 ): cv.positive_float,
@@ -235,6 +439,10 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_MIN_TIME_BETWEEN_REQUESTS,
                     default=defaults[CONF_MIN_TIME_BETWEEN_REQUESTS],
                 ): cv.positive_float,
+                vol.Optional(
+                    CONF_API_KEY,
+                    description={"suggested_value": defaults[CONF_API_KEY]},
+                ): str,
             }
         )
 
@@ -244,9 +452,9 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         try:
-            prec_errors = self._precision_field_errors(user_input)
-            if prec_errors:
-                errors.update(prec_errors)
+            field_errors = self._text_field_errors(user_input)
+            if field_errors:
+                errors.update(field_errors)
                 return self.async_show_form(
                     step_id="user",
                     data_schema=cryptoinfo_schema,
@@ -267,10 +475,11 @@ class CryptoInfoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(user_input[CONF_ID])
             self._abort_if_unique_id_configured()
 
-            # Update the shared min_time_between_requests
+            # Update the shared min_time_between_requests and API key
             self.hass.data[DOMAIN].min_time_between_requests = user_input[
                 CONF_MIN_TIME_BETWEEN_REQUESTS
             ]
+            self.hass.data[DOMAIN].api_key = user_input.pop(CONF_API_KEY, "").strip()
 
             # Create the config entry
             return self.async_create_entry(
@@ -4,6 +4,8 @@ from typing import Any
 
 import voluptuous as vol
 
+from .helper.ticker_stream import PROVIDERS
+
 
 def precision(value: Any) -> str:
     """Normalize CoinGecko `precision` (empty, full, or 0–18)."""
@@ -21,3 +23,127 @@ def precision(value: Any) -> str:
     raise vol.Invalid(
         "Must be empty (CoinGecko default), full, or a whole number from 0 to 18"
     )
+
+
+def price_threshold(value: Any) -> str:
+    """Normalize a price change threshold (empty, absolute, or percent)."""
+    if value is None:
+        return ""
+    v = str(value).strip().replace(" ", "")
+    if not v:
+        return ""
+    number = v[:-1] if v.endswith("%") else v
+    try:
+        if float(number) >= 0:
+            return v
+    except ValueError:
+        pass
+    raise vol.Invalid(
+        "Must be empty, a positive number, or a positive percentage like 0.5%"
+    )
+
+
+def parse_price_threshold(value: str) -> tuple[float, bool]:
+    """Return the threshold value and whether it is a percentage."""
+    if not value:
+        return 0.0, False
+    if value.endswith("%"):
+        return float(value[:-1]), True
+    return float(value), False
+
+
+def statistics_windows(value: Any) -> str:
+    """Normalize a comma separated list of statistics windows (in updates)."""
+    if value is None:
+        return ""
+    windows = [window.strip() for window in str(value).split(",") if window.strip()]
+    if all(window.isdigit() and 2 <= int(window) <= 10000 for window in windows):
+        return ", ".join(str(int(window)) for window in windows)
+    raise vol.Invalid(
+        "Must be empty or whole numbers from 2 to 10000, separated by commas"
+    )
+
+
+def parse_statistics_windows(value: str) -> list[int]:
+    """Return the statistics windows as numbers."""
+    return sorted({int(window) for window in value.split(",") if window.strip()})
+
+
+def streaming_provider(value: Any) -> str:
+    """Normalize the exchange of the ticker stream (empty for none)."""
+    v = str(value or "").strip().lower()
+    if not v or v in PROVIDERS:
+        return v
+    raise vol.Invalid(f"Must be empty or one of: {', '.join(PROVIDERS)}")
+
+
+def price_alerts(value: Any) -> str:
+    """Normalize a comma separated list of `<cryptocurrency id> <price or %>` alerts."""
+    v = str(value or "").strip()
+    if not v:
+        return ""
+    alerts = []
+    for alert in v.split(","):
+        parts = alert.split()
+        if len(parts) == 2:
+            coin_id, threshold = parts[0].lower(), parts[1]
+            number = threshold[:-1] if threshold.endswith("%") else threshold
+            try:
+                if float(number) > 0:
+                    alerts.append(f"{coin_id} {threshold}")
+                    continue
+            except ValueError:
+                pass
+        raise vol.Invalid(
+            "Must be empty or alerts like 'bitcoin 50000' or 'ethereum 5%', separated by commas"
+        )
+    return ", ".join(alerts)
+
+
+def parse_price_alerts(value: str) -> dict[str, tuple[list[float], list[float]]]:
+    """Return the price thresholds and 24h change percentages per coin."""
+    alerts: dict[str, tuple[list[float], list[float]]] = {}
+    for alert in value.split(","):
+        if not alert.strip():
+            continue
+        coin_id, threshold = alert.split()
+        prices, changes = alerts.setdefault(coin_id, ([], []))
+        if threshold.endswith("%"):
+            changes.append(float(threshold[:-1]))
+        else:
+            prices.append(float(threshold))
+    return alerts
+
+
+def top_count(value: Any) -> str:
+    """Normalize the number of top coins by market cap (empty for none)."""
+    v = str(value or "").strip()
+    if not v:
+        return ""
+    if v.isdigit() and 1 <= int(v) <= 250:
+        return str(int(v))
+    raise vol.Invalid("Must be empty or a whole number from 1 to 250")
+
+
+def adaptive_update_frequency(value: Any) -> str:
+    """Normalize the `<minimum>-<maximum>` minutes of an adaptive update frequency."""
+    v = str(value or "").strip().replace(" ", "")
+    if not v:
+        return ""
+    try:
+        minimum, maximum = (float(bound) for bound in v.split("-"))
+        if 0 < minimum <= maximum:
+            return f"{minimum:g}-{maximum:g}"
+    except ValueError:
+        pass
+    raise vol.Invalid(
+        "Must be empty or the minimum and maximum minutes between updates, like 0.5-15"
+    )
+
+
+def parse_adaptive_update_frequency(value: str) -> tuple[float, float] | None:
+    """Return the minimum and maximum minutes between updates."""
+    if not value:
+        return None
+    minimum, maximum = value.split("-")
+    return float(minimum), float(maximum)
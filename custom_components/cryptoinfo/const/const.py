@@ -9,9 +9,29 @@ CONF_MULTIPLIERS = "multipliers"
 CONF_UPDATE_FREQUENCY = "update_frequency"
 CONF_UNIT_OF_MEASUREMENT = "unit_of_measurement"
 CONF_MIN_TIME_BETWEEN_REQUESTS = "min_time_between_requests"
+CONF_API_KEY = "api_key"
 CONF_PRECISION = "precision"
+CONF_PRICE_THRESHOLD = "price_threshold"
+CONF_EXCLUDE_STATIC_ATTRIBUTES = "exclude_static_attributes"
+CONF_STATISTICS_WINDOWS = "statistics_windows"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_STREAMING_PROVIDER = "streaming_provider"
+CONF_PORTFOLIO = "portfolio"
+CONF_PRICE_ALERTS = "price_alerts"
+CONF_TOP_COUNT = "top_count"
+CONF_ADAPTIVE_UPDATE_FREQUENCY = "adaptive_update_frequency"
 
 SENSOR_PREFIX = "Cryptoinfo "
+STATISTIC_TYPES = ("sma", "ema", "high", "low", "volatility")
+# Diagnostic sensor metric and its unit
+DIAGNOSTIC_METRICS = {
+    "update_latency": "ms",
+    "requests": None,
+    "rate_limited": None,
+    "cache_hit_ratio": "%",
+    "entity_writes": None,
+    "update_interval": "s",
+}
 ATTR_LAST_UPDATE = "last_update"
 ATTR_CRYPTOCURRENCY_ID = "cryptocurrency_id"
 ATTR_CRYPTOCURRENCY_NAME = "cryptocurrency_name"
@@ -35,7 +55,10 @@ ATTR_ATH_CHANGE = "ath_change"
 ATTR_RANK = "rank"
 ATTR_IMAGE = "image"
 ATTR_PRECISION = "precision"
+ATTR_STALE = "stale"
+ATTR_HOLDINGS = "holdings"
 
 API_ENDPOINT = "https://api.coingecko.com/api/v3/"
+PRO_API_ENDPOINT = "https://pro-api.coingecko.com/api/v3/"
 
 _LOGGER = logging.getLogger(__name__)
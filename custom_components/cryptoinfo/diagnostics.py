@@ -0,0 +1,42 @@
+"""Diagnostics support for Cryptoinfo."""
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const.const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the performance metrics of a config entry."""
+    data = hass.data[DOMAIN]
+    coordinator = data.coordinators.get(entry.entry_id)
+    diagnostics = {
+        "entry": dict(entry.data),
+        "min_time_between_requests": data.min_time_between_requests,
+        "fetcher": data.fetcher.diagnostics(),
+        "refresh_service": {
+            "requests": data.refresher.requests,
+            "batches": data.refresher.batches,
+        },
+    }
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "last_update": coordinator.last_update,
+            "stale": coordinator.stale,
+            **coordinator.metrics.as_dict(),
+        }
+        if coordinator.adaptive_interval is not None:
+            diagnostics["adaptive_interval"] = coordinator.adaptive_interval.as_dict()
+        stream = coordinator.ticker_stream
+        if stream is not None:
+            diagnostics["ticker_stream"] = {
+                "connected": stream.connected,
+                "ticks": stream.ticks,
+                "prices": len(coordinator.stream_prices),
+            }
+    return diagnostics
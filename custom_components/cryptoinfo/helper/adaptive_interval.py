@@ -0,0 +1,116 @@
+"""Update interval that adapts to the market and the API for CryptoInfo."""
+
+import math
+
+from homeassistant.util import dt as dt_util
+
+from .market_quote import MarketQuote
+
+# Expected price move between two updates the interval aims for, in percent
+TARGET_MOVE = 0.2
+# Weight of the newest observation in the volatility and cadence averages
+VOLATILITY_ALPHA = 0.3
+CADENCE_ALPHA = 0.3
+
+
+class AdaptiveInterval:
+    """Update interval between a minimum and a maximum.
+
+    The volatility is a moving average of the squared relative price moves
+    per second, of the coin that moves most. The interval is the time in
+    which the price is expected to move `TARGET_MOVE` percent: short in fast
+    markets, long in quiet ones.
+
+    The `last_updated` times of CoinGecko show how often the API refreshes
+    its data. Polling faster than that only returns the same data again, so
+    the interval never goes below the learned refresh cadence.
+    """
+
+    def __init__(self, minimum: float, maximum: float, initial: float):
+        """Initialize the interval, all in seconds."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = min(max(initial, minimum), maximum)
+        # Squared relative price move per second
+        self.volatility: float | None = None
+        # Seconds between two refreshes of the API data
+        self.cadence: float | None = None
+        self.unchanged_polls = 0
+        self._last_updated: str | None = None
+        self._unchanged = False
+        self._prices: dict[str, float] = {}
+        self._observed_at: float | None = None
+
+    def observe(self, quotes: dict[str, MarketQuote], now: float) -> float:
+        """Learn from the quotes of an update and return the next interval."""
+        newest = max(
+            (quote.last_updated for quote in quotes.values() if quote.last_updated),
+            default=None,
+        )
+        if newest is None or newest == self._last_updated:
+            # Polled before the API refreshed its data
+            self.unchanged_polls += 1
+            self._unchanged = True
+            return self._update()
+
+        if self._unchanged and self._last_updated is not None:
+            # The previous poll came too early, so this gap is the cadence
+            # give or take one interval
+            gap = (
+                dt_util.parse_datetime(newest)
+                - dt_util.parse_datetime(self._last_updated)
+            ).total_seconds()
+            if gap > 0:
+                self.cadence = (
+                    gap
+                    if self.cadence is None
+                    else self.cadence + CADENCE_ALPHA * (gap - self.cadence)
+                )
+        self._last_updated = newest
+        self._unchanged = False
+
+        prices = {
+            coin_id: float(quote.current_price)
+            for coin_id, quote in quotes.items()
+            if quote.current_price
+        }
+        if self._observed_at is not None and now > self._observed_at:
+            moves = [
+                math.log(price / self._prices[coin_id]) ** 2
+                for coin_id, price in prices.items()
+                if self._prices.get(coin_id)
+            ]
+            if moves:
+                rate = max(moves) / (now - self._observed_at)
+                self.volatility = (
+                    rate
+                    if self.volatility is None
+                    else self.volatility + VOLATILITY_ALPHA * (rate - self.volatility)
+                )
+        self._prices = prices
+        self._observed_at = now
+        return self._update()
+
+    def _update(self) -> float:
+        interval = self.interval
+        if self.volatility is not None:
+            interval = (
+                (TARGET_MOVE / 100) ** 2 / self.volatility
+                if self.volatility
+                else self.maximum
+            )
+        if self.cadence is not None:
+            interval = max(interval, self.cadence)
+        self.interval = min(max(interval, self.minimum), self.maximum)
+        return self.interval
+
+    def as_dict(self) -> dict:
+        """Return the state in a JSON serializable form."""
+        return {
+            "interval": self.interval,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "volatility": self.volatility,
+            "cadence": self.cadence,
+            "unchanged_polls": self.unchanged_polls,
+        }
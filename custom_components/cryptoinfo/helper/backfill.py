@@ -0,0 +1,78 @@
+"""Price history backfill from CoinGecko /market_chart/range for CryptoInfo."""
+
+import time
+
+from ..const.const import _LOGGER
+
+# CoinGecko only serves a year of history to the public API
+BACKFILL_MAX_SPAN = 365 * 86400
+
+
+def chart_granularity(span: float) -> float:
+    """Return the seconds between the points CoinGecko returns for a range."""
+    if span <= 86400:
+        return 300
+    if span <= 90 * 86400:
+        return 3600
+    return 86400
+
+
+def missing_ranges(
+    bounds: tuple[float, float] | None, start: float, end: float, step: float
+) -> list[tuple[float, float]]:
+    """Return the ranges between `start` and `end` that the history lacks.
+
+    A gap is only missing when it is wider than the updates and the points
+    CoinGecko would return for it, so the coarse parts of a backfill aren't
+    requested again on every start.
+    """
+    if bounds is None:
+        return [(start, end)]
+    first, last = bounds
+    ranges = []
+    if first - start > max(step, chart_granularity(first - start)):
+        ranges.append((start, first))
+    if end - last > 2 * step:
+        ranges.append((max(last, start), end))
+    return ranges
+
+
+async def async_backfill_history(coordinator, fetcher, store) -> None:
+    """Fill the gaps in the stored price history of all coins of a coordinator.
+
+    Fetched ranges are merged into the history files, then the in memory
+    histories are rebuilt so the statistics start with full windows.
+    """
+    step = coordinator.update_frequency.total_seconds()
+    changed = False
+    for coin_id in list(coordinator.history):
+        key = coordinator.history_key(coin_id)
+        end = time.time()
+        start = end - min(coordinator.history_span, BACKFILL_MAX_SPAN)
+        bounds = await store.async_get_history_bounds(key)
+        ranges = missing_ranges(bounds, start, end, step)
+        # Keep the file from growing beyond twice the history span
+        if not ranges and bounds is not None and bounds[0] < 2 * start - end:
+            await store.async_merge_history(key, [], start)
+        samples = []
+        for range_start, range_end in ranges:
+            _LOGGER.debug(f"Backfill {key} from {range_start:.0f} to {range_end:.0f}")
+            chart = await fetcher.async_fetch_chart(
+                coin_id,
+                coordinator.currency_name,
+                range_start,
+                range_end,
+                coordinator.precision,
+            )
+            if chart is None:
+                # The circuit breaker is open, try again on the next start
+                break
+            samples.extend(chart)
+        if not samples:
+            continue
+        merged = await store.async_merge_history(key, samples, start)
+        coordinator.replace_history(coin_id, merged)
+        changed = True
+
+    if changed:
+        coordinator.async_update_listeners()
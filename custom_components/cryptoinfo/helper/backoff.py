@@ -0,0 +1,141 @@
+"""Backoff and circuit breaker for CryptoInfo API requests."""
+
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+import random
+import time
+
+BACKOFF_BASE = 30.0
+BACKOFF_MAX = 900.0
+
+
+def _to_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Return the seconds to wait according to the response headers.
+
+    Understands `Retry-After` as delta-seconds or an HTTP date, and the
+    `X-RateLimit-Remaining`/`X-RateLimit-Reset` pair (reset as epoch
+    seconds or as seconds from now).
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        seconds = _to_float(retry_after)
+        if seconds is None:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return max(seconds, 0.0)
+
+    remaining = _to_float(headers.get("X-RateLimit-Remaining"))
+    reset = _to_float(headers.get("X-RateLimit-Reset"))
+    if remaining is not None and remaining <= 0 and reset is not None:
+        if reset > 1e9:
+            reset -= time.time()
+        return max(reset, 0.0)
+    return None
+
+
+class CircuitBreaker:
+    """Circuit breaker with exponential backoff shared by all coordinators.
+
+    Every failure opens the circuit for an exponentially growing, jittered
+    delay (at least as long as the server asked for). Once the delay has
+    passed a single trial request is let through; its success closes the
+    circuit again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX):
+        """Initialize the breaker."""
+        self._base = base
+        self._maximum = maximum
+        self._failures = 0
+        self._open_until = 0.0
+        self._trial_running = False
+        self.rate_limited_count = 0
+
+    @property
+    def state(self) -> str:
+        """Return the current state of the circuit."""
+        if time.monotonic() < self._open_until:
+            return self.OPEN
+        if self._failures:
+            return self.HALF_OPEN
+        return self.CLOSED
+
+    @property
+    def trial_running(self) -> bool:
+        """Return True while the trial request of a half open circuit runs."""
+        return self._trial_running
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until requests are allowed again."""
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        state = self.state
+        if state == self.OPEN:
+            return False
+        if state == self.HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return True
+
+    def allow_queued_request(self, trial: bool) -> bool:
+        """Return True if a request allowed before waiting may be sent now.
+
+        Requests wait for the rate limiter after `allow_request`, the
+        circuit can open in the meantime. `trial` tells if the request is
+        the trial request of a half open circuit.
+        """
+        state = self.state
+        if state == self.OPEN:
+            if trial:
+                self._trial_running = False
+            return False
+        if state == self.HALF_OPEN and not trial:
+            return self.allow_request()
+        return True
+
+    def backoff(self) -> float:
+        """Return the jittered exponential delay for the current failure count."""
+        ceiling = min(self._maximum, self._base * 2 ** max(self._failures - 1, 0))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def record_success(self, hold: float | None = None) -> None:
+        """Close the circuit, optionally pausing until a rate limit resets."""
+        self._failures = 0
+        self._trial_running = False
+        self._open_until = time.monotonic() + hold if hold else 0.0
+
+    def abort_trial(self) -> None:
+        """Let another trial request through after one ended without a verdict."""
+        self._trial_running = False
+
+    def record_failure(
+        self, retry_after: float | None = None, rate_limited: bool = False
+    ) -> float:
+        """Open the circuit and return the delay before the next attempt."""
+        self._failures += 1
+        self._trial_running = False
+        if rate_limited:
+            self.rate_limited_count += 1
+        delay = max(self.backoff(), retry_after or 0.0)
+        self._open_until = time.monotonic() + delay
+        return delay
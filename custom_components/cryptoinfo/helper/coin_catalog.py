@@ -0,0 +1,115 @@
+"""Indexed catalog of the CoinGecko coin ids for CryptoInfo."""
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import difflib
+
+CATALOG_MAX_AGE = timedelta(days=1)
+
+
+def _prefix_range(keys: list[str], prefix: str) -> tuple[int, int]:
+    """Return the slice of sorted keys that start with a prefix."""
+    start = bisect_left(keys, prefix)
+    end = bisect_left(keys, prefix + "\uffff", start)
+    return start, end
+
+
+class CoinCatalog:
+    """The /coins/list catalog, indexed by id, symbol and name.
+
+    Lookups, prefix and fuzzy searches run in memory, so ids can be checked
+    and completed without a request.
+    """
+
+    def __init__(
+        self,
+        coins: Iterable[tuple[str, str, str]] = (),
+        updated: datetime | None = None,
+    ):
+        """Initialize the catalog from (id, symbol, name) entries."""
+        self.updated = updated
+        self._coins: dict[str, tuple[str, str]] = {}
+        self._by_symbol: dict[str, list[str]] = {}
+        self._by_name: dict[str, list[str]] = {}
+        for coin_id, symbol, name in coins:
+            self._coins[coin_id] = (symbol, name)
+            self._by_symbol.setdefault(symbol.lower(), []).append(coin_id)
+            self._by_name.setdefault(name.lower(), []).append(coin_id)
+        self._ids = sorted(self._coins)
+        self._names = sorted(self._by_name)
+
+    def __len__(self) -> int:
+        """Return the number of coins in the catalog."""
+        return len(self._coins)
+
+    def __contains__(self, coin_id: str) -> bool:
+        """Return True if a coin id is in the catalog."""
+        return coin_id in self._coins
+
+    def is_outdated(self, now: datetime) -> bool:
+        """Return True if the catalog should be refreshed."""
+        return self.updated is None or now - self.updated >= CATALOG_MAX_AGE
+
+    def is_known(self, coin_id: str) -> bool:
+        """Return True if a coin id is known, or there is no catalog yet."""
+        return not self._coins or coin_id in self._coins
+
+    def get(self, coin_id: str) -> tuple[str, str] | None:
+        """Return the symbol and name of a coin."""
+        return self._coins.get(coin_id)
+
+    def lookup(self, term: str) -> list[str]:
+        """Return the ids of the coins with this id, symbol or name."""
+        term = term.strip().lower()
+        ids = [term] if term in self._coins else []
+        for coin_id in self._by_symbol.get(term, []) + self._by_name.get(term, []):
+            if coin_id not in ids:
+                ids.append(coin_id)
+        return ids
+
+    def search(self, prefix: str, limit: int = 10) -> list[str]:
+        """Return the ids of the coins whose id or name starts with a prefix."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        start, end = _prefix_range(self._ids, prefix)
+        ids = self._ids[start : min(end, start + limit)]
+        start, end = _prefix_range(self._names, prefix)
+        for name in self._names[start:end]:
+            for coin_id in self._by_name[name]:
+                if len(ids) >= limit:
+                    return ids
+                if coin_id not in ids:
+                    ids.append(coin_id)
+        return ids
+
+    def suggest(self, term: str, limit: int = 3) -> list[str]:
+        """Return the ids that are most likely meant by a term.
+
+        Exact symbol and name matches come first, then prefix matches, then
+        ids that are spelled alike. The fuzzy search only looks at the ids
+        with the same first letter to stay fast on the full catalog.
+        """
+        term = term.strip().lower()
+        if not term:
+            return []
+        ids = self.lookup(term)
+        if len(ids) < limit:
+            ids.extend(
+                coin_id for coin_id in self.search(term, limit) if coin_id not in ids
+            )
+        if len(ids) < limit:
+            start, end = _prefix_range(self._ids, term[0])
+            ids.extend(
+                coin_id
+                for coin_id in difflib.get_close_matches(
+                    term, self._ids[start:end], n=limit, cutoff=0.7
+                )
+                if coin_id not in ids
+            )
+        return ids[:limit]
+
+    def as_list(self) -> list[list[str]]:
+        """Return the catalog in a JSON serializable form."""
+        return [[coin_id, *self._coins[coin_id]] for coin_id in self._ids]
@@ -1,11 +1,42 @@
+from datetime import datetime, timedelta
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from ..const.const import _LOGGER
+from .backoff import CircuitBreaker
+from .coin_catalog import CoinCatalog
+from .markets_fetcher import CryptoMarketsFetcher
+from .portfolio import Portfolio
+from .providers import CoinGeckoProProvider, CoinGeckoProvider, ProviderPool
+from .refresh_batcher import RefreshBatcher
+from .rate_limiter import RateLimiter
 from .storage_helper import CryptoInfoStore
 
+# Seconds after the start before the coin catalog is checked, so the first
+# refreshes of the entries are queued before the large /coins/list request
+CATALOG_START_DELAY = 60
+# The catalog is refreshed once it is a day old, see CATALOG_MAX_AGE
+CATALOG_CHECK_INTERVAL = timedelta(hours=1)
+
 
 class CryptoInfoData:
     def __init__(self, hass):
         self._hass = hass
         self.store = CryptoInfoStore(hass)
         self._min_time_between_requests = 0.25
+        self.rate_limiter = RateLimiter(self._min_time_between_requests * 60)
+        self.circuit_breaker = CircuitBreaker()
+        self._coingecko = CoinGeckoProvider(self.rate_limiter, self.circuit_breaker)
+        self.providers = ProviderPool([self._coingecko])
+        self.fetcher = CryptoMarketsFetcher(hass, self.providers, self.store)
+        # Coordinator of every loaded config entry, for diagnostics
+        self.coordinators = {}
+        self.catalog = CoinCatalog()
+        self.portfolio = Portfolio(hass)
+        self.refresher = RefreshBatcher(hass)
+        self._catalog_unsubs: list[CALLBACK_TYPE] = []
 
     async def async_initialize(self):
         """Initialize the data from storage."""
@@ -13,6 +44,70 @@ class CryptoInfoData:
         self._min_time_between_requests = self.store.data.get(
             "min_time_between_requests", 0.25
         )
+        self.rate_limiter.interval = float(self._min_time_between_requests) * 60
+        self._update_providers(self.api_key)
+        catalog = await self.store.async_load_catalog()
+        if catalog:
+            updated, coins = catalog
+            self.catalog = CoinCatalog(coins, updated)
+
+    @callback
+    def async_start_catalog_updates(self) -> None:
+        """Keep the coin catalog up to date while entries are loaded."""
+        if self._catalog_unsubs:
+            return
+        self._catalog_unsubs = [
+            async_call_later(
+                self._hass, CATALOG_START_DELAY, self._async_check_catalog
+            ),
+            async_track_time_interval(
+                self._hass, self._async_check_catalog, CATALOG_CHECK_INTERVAL
+            ),
+        ]
+
+    @callback
+    def async_stop_catalog_updates(self) -> None:
+        """Stop updating the coin catalog after the last entry unloaded."""
+        for unsub in self._catalog_unsubs:
+            unsub()
+        self._catalog_unsubs = []
+
+    @callback
+    def _async_check_catalog(self, _now: datetime) -> None:
+        self._hass.async_create_background_task(
+            self.async_update_catalog(), "cryptoinfo coin catalog"
+        )
+
+    async def async_update_catalog(self) -> None:
+        """Refresh the coin catalog from /coins/list, at most once a day."""
+        if not self.catalog.is_outdated(dt_util.utcnow()):
+            return
+        coins = await self.fetcher.async_fetch_coin_list()
+        if not coins:
+            return
+        self.catalog = CoinCatalog(coins, dt_util.utcnow())
+        await self.store.async_save_catalog(self.catalog.as_list())
+        _LOGGER.debug(f"Updated the coin catalog, {len(self.catalog)} coins")
+
+    def _update_providers(self, api_key: str) -> None:
+        """Use the Pro API next to the public API when there is an API key."""
+        providers = [self._coingecko]
+        if api_key:
+            providers.insert(0, CoinGeckoProProvider(api_key))
+        self.providers.providers = providers
+
+    @property
+    def api_key(self) -> str:
+        """Return the CoinGecko Pro API key, shared by all entries."""
+        return self.store.data.get("api_key", "")
+
+    @api_key.setter
+    def api_key(self, value: str) -> None:
+        if value == self.api_key:
+            return
+        self.store.data["api_key"] = value
+        self._update_providers(value)
+        self._hass.async_create_task(self.store.async_save())
 
     @property
     def min_time_between_requests(self):
@@ -21,5 +116,6 @@ class CryptoInfoData:
     @min_time_between_requests.setter
     def min_time_between_requests(self, value):
         self._min_time_between_requests = value
+        self.rate_limiter.interval = float(value) * 60
         self.store.data["min_time_between_requests"] = value
         self._hass.async_create_task(self.store.async_save())
@@ -0,0 +1,108 @@
+"""Compact binary price history files for CryptoInfo."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+import mmap
+import os
+import sys
+
+# One record is a (timestamp, price) pair of little-endian float64 values
+RECORD_SIZE = 16
+
+
+def _to_array(samples: Iterable[tuple[float, float]]) -> array:
+    data = array("d")
+    for timestamp, price in samples:
+        data.append(timestamp)
+        data.append(price)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data
+
+
+class HistoryFile:
+    """Time ordered (timestamp, price) samples of one coin in a flat file.
+
+    The file is memory mapped for reading, so looking up the covered range
+    or the samples after a timestamp doesn't parse the whole series. All
+    methods block and are run in the executor.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the file."""
+        self.path = path
+
+    def _read(self, since: float | None = None, bounds: bool = False):
+        """Return the samples after `since`, or only the first and last."""
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return None if bounds else []
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            # Ignore a record that was cut off by a crash during a write
+            size -= size % RECORD_SIZE
+            if not size:
+                return None if bounds else []
+            with (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+                memoryview(mapped) as view,
+                view[:size] as records,
+                records.cast("d") as values,
+            ):
+                count = size // RECORD_SIZE
+                if bounds:
+                    data = array("d", (values[0], values[2 * count - 2]))
+                else:
+                    start = 0
+                    if since is not None:
+                        start = bisect_left(
+                            range(count), since, key=lambda i: values[2 * i]
+                        )
+                    data = array("d", values[2 * start :])
+        if sys.byteorder == "big":
+            data.byteswap()
+        if bounds:
+            return data[0], data[1]
+        return list(zip(data[0::2], data[1::2]))
+
+    def bounds(self) -> tuple[float, float] | None:
+        """Return the first and last timestamp in the file."""
+        return self._read(bounds=True)
+
+    def read(self, since: float | None = None) -> list[tuple[float, float]]:
+        """Return the samples from `since` on, from old to new."""
+        return self._read(since)
+
+    def append(self, samples: list[tuple[float, float]]) -> None:
+        """Append samples that are newer than the last one in the file."""
+        last = self.bounds()
+        if last is not None:
+            samples = [sample for sample in samples if sample[0] > last[1]]
+        if not samples:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "ab") as file:
+            size = file.tell()
+            if size % RECORD_SIZE:
+                file.truncate(size - size % RECORD_SIZE)
+            _to_array(samples).tofile(file)
+
+    def merge(
+        self, samples: list[tuple[float, float]], since: float
+    ) -> list[tuple[float, float]]:
+        """Merge samples into the file, dropping samples older than `since`.
+
+        Samples at a timestamp that is already in the file are ignored. The
+        file is replaced atomically and the merged samples are returned.
+        """
+        merged = dict(sample for sample in samples if sample[0] >= since)
+        merged.update(self.read(since))
+        result = sorted(merged.items())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            _to_array(result).tofile(file)
+        os.replace(temp_path, self.path)
+        return result
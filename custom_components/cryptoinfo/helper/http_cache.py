@@ -0,0 +1,98 @@
+"""HTTP response cache for CryptoInfo API requests."""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import time
+from typing import Any
+
+MAX_ENTRIES = 32
+
+
+def _max_age(headers: Mapping[str, str]) -> float:
+    """Return the `Cache-Control: max-age` in seconds, or 0."""
+    max_age = 0.0
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        name = name.lower()
+        if name in ("no-cache", "no-store"):
+            return 0.0
+        if name == "max-age":
+            try:
+                max_age = float(value.strip('"'))
+            except ValueError:
+                max_age = 0.0
+    return max(max_age, 0.0)
+
+
+class CacheEntry:
+    """Parsed response together with its validators."""
+
+    __slots__ = ("data", "etag", "expires", "last_modified")
+
+    def __init__(self, data: Any, headers: Mapping[str, str]):
+        """Initialize the entry."""
+        self.data = data
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.expires = time.monotonic() + _max_age(headers)
+
+
+class HttpCache:
+    """Small LRU cache of parsed responses keyed by URL.
+
+    Supports conditional requests (ETag/Last-Modified) and skips requests
+    entirely while `Cache-Control: max-age` says the response is fresh.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        """Initialize the cache."""
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def fresh(self, url: str) -> Any | None:
+        """Return the cached data if it may be used without a request."""
+        entry = self._entries.get(url)
+        if entry is None or entry.expires <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return entry.data
+
+    def is_fresh(self, url: str) -> bool:
+        """Return True if `fresh` would return the cached data, without counting."""
+        entry = self._entries.get(url)
+        return entry is not None and entry.expires > time.monotonic()
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """Return the conditional request headers for a URL."""
+        entry = self._entries.get(url)
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> Any | None:
+        """Handle a 304 response and return the cached data."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        self.not_modified += 1
+        entry.expires = time.monotonic() + _max_age(headers)
+        entry.etag = headers.get("ETag", entry.etag)
+        self._entries.move_to_end(url)
+        return entry.data
+
+    def store(self, url: str, headers: Mapping[str, str], data: Any) -> None:
+        """Store a parsed response."""
+        self._entries[url] = CacheEntry(data, headers)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
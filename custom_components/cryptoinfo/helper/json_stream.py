@@ -0,0 +1,90 @@
+"""Incremental JSON array parser for CryptoInfo API responses."""
+
+from collections.abc import AsyncIterator
+import codecs
+import json
+from typing import Any
+
+from aiohttp import StreamReader
+
+CHUNK_SIZE = 16384
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonArrayParser:
+    """Parse a JSON array fed in chunks, returning the items one by one.
+
+    Only one item and the unparsed rest of the last chunk are held at a
+    time, instead of the whole body and the whole decoded list.
+    """
+
+    def __init__(self):
+        """Initialize the parser."""
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._expect_item = True
+        self._done = False
+
+    def _skip_whitespace(self, pos: int) -> int:
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def feed(self, chunk: bytes, final: bool = False) -> list[Any]:
+        """Add a chunk of the body and return the items it completed."""
+        self._buffer += self._text.decode(chunk, final)
+        items = []
+        pos = self._skip_whitespace(0)
+        if not self._started and pos < len(self._buffer):
+            if self._buffer[pos] != "[":
+                raise ValueError("Expected a JSON array")
+            self._started = True
+            pos = self._skip_whitespace(pos + 1)
+        while self._started and not self._done and pos < len(self._buffer):
+            char = self._buffer[pos]
+            if char == "]":
+                self._done = True
+                pos += 1
+                break
+            if not self._expect_item:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' at {pos}")
+                self._expect_item = True
+                pos = self._skip_whitespace(pos + 1)
+                continue
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            end_of_item = self._skip_whitespace(end)
+            if not final and (
+                end_of_item == len(self._buffer)
+                or self._buffer[end_of_item] not in ",]"
+            ):
+                # A number could go on in the next chunk
+                break
+            items.append(item)
+            self._expect_item = False
+            pos = end_of_item
+        self._buffer = self._buffer[pos:]
+        if final and not self._done:
+            raise ValueError("Unexpected end of JSON array")
+        return items
+
+
+async def async_iter_json_array(
+    content: StreamReader, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[Any]:
+    """Yield the items of a JSON array response body while it is read."""
+    parser = JsonArrayParser()
+    async for chunk in content.iter_chunked(chunk_size):
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.feed(b"", final=True):
+        yield item
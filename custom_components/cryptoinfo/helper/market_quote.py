@@ -0,0 +1,106 @@
+"""Compact market data record for CryptoInfo."""
+
+from typing import Any
+
+# Record field and the matching CoinGecko /coins/markets key
+FIELDS = (
+    ("id", "id"),
+    ("name", "name"),
+    ("symbol", "symbol"),
+    ("image", "image"),
+    ("current_price", "current_price"),
+    ("total_volume", "total_volume"),
+    ("change_1h", "price_change_percentage_1h_in_currency"),
+    ("change_24h", "price_change_percentage_24h_in_currency"),
+    ("change_7d", "price_change_percentage_7d_in_currency"),
+    ("change_14d", "price_change_percentage_14d_in_currency"),
+    ("change_30d", "price_change_percentage_30d_in_currency"),
+    ("change_1y", "price_change_percentage_1y_in_currency"),
+    ("market_cap", "market_cap"),
+    ("circulating_supply", "circulating_supply"),
+    ("total_supply", "total_supply"),
+    ("ath", "ath"),
+    ("ath_date", "ath_date"),
+    ("ath_change", "ath_change_percentage"),
+    ("rank", "market_cap_rank"),
+    ("last_updated", "last_updated"),
+)
+
+# Fields that move together with the price on every fetch
+FAST_FIELDS = frozenset(
+    {
+        "current_price",
+        "total_volume",
+        "change_1h",
+        "change_24h",
+        "change_7d",
+        "change_14d",
+        "change_30d",
+        "change_1y",
+        "market_cap",
+        "last_updated",
+    }
+)
+
+# Fields that are in the vs_currency of the request
+CURRENCY_FIELDS = FAST_FIELDS - {"last_updated"} | {"ath", "ath_date", "ath_change"}
+
+
+class MarketQuote:
+    """Market data of one coin, holding only the fields the sensors expose."""
+
+    __slots__ = tuple(field for field, _ in FIELDS)
+
+    def __init__(self, **values: Any):
+        """Initialize the record, missing fields are None."""
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_api(cls, coin: dict[str, Any]) -> "MarketQuote":
+        """Create a record from a CoinGecko /coins/markets item."""
+        return cls(**{field: coin.get(key) for field, key in FIELDS})
+
+    @classmethod
+    def from_simple_price(
+        cls,
+        base: "MarketQuote | None",
+        coin_id: str,
+        prices: dict[str, Any],
+        currency_name: str,
+    ) -> "MarketQuote":
+        """Create a record from a /simple/price item in another currency.
+
+        The currency independent fields are taken from the record of the base
+        currency; fields that /simple/price doesn't return are None.
+        """
+        quote = cls(id=coin_id)
+        if base is not None:
+            for field in cls.__slots__:
+                if field not in CURRENCY_FIELDS:
+                    setattr(quote, field, getattr(base, field))
+        currency = currency_name.lower()
+        quote.current_price = prices.get(currency)
+        quote.market_cap = prices.get(f"{currency}_market_cap")
+        quote.total_volume = prices.get(f"{currency}_24h_vol")
+        quote.change_24h = prices.get(f"{currency}_24h_change")
+        return quote
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> "MarketQuote":
+        """Create a record from the output of `as_dict`."""
+        return cls(**values)
+
+    def replace(self, **values: Any) -> "MarketQuote":
+        """Return a copy of the record with some fields changed."""
+        return MarketQuote(
+            **{field: getattr(self, field) for field in self.__slots__} | values
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a JSON serializable dict."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return the representation of the record."""
+        return f"MarketQuote({self.id!r}, current_price={self.current_price!r})"
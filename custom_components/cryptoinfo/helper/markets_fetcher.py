@@ -0,0 +1,572 @@
+"""Shared CoinGecko /coins/markets and /simple/price fetcher for CryptoInfo."""
+
+import asyncio
+from datetime import datetime
+from itertools import islice
+import math
+import time
+from urllib.parse import quote, urlencode
+
+from aiohttp import ClientError, ClientResponse, ClientResponseError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
+from homeassistant.util import dt as dt_util
+
+from ..const.const import _LOGGER
+from .backoff import parse_retry_after
+from .http_cache import HttpCache
+from .json_stream import async_iter_json_array
+from .metrics import FetchMetrics
+from .market_quote import MarketQuote
+from .providers import ProviderPool
+from .storage_helper import CryptoInfoStore
+
+MARKETS_PER_PAGE = 250
+MAX_IDS_LENGTH = 4000
+
+
+async def _async_parse_chart(response: ClientResponse) -> list[tuple[float, float]]:
+    """Return the prices of a /market_chart response as (timestamp, price)."""
+    payload = await response.json()
+    return [
+        (timestamp / 1000, float(price))
+        for timestamp, price in payload.get("prices") or []
+        if price is not None
+    ]
+
+
+async def _async_parse_coin_list(
+    response: ClientResponse,
+) -> list[tuple[str, str, str]]:
+    """Return the coins of a /coins/list response as (id, symbol, name)."""
+    return [
+        (coin["id"], coin.get("symbol") or "", coin.get("name") or "")
+        async for coin in async_iter_json_array(response.content)
+    ]
+
+
+class MarketsGroup:
+    """Coordinators that share one (vs_currency, precision) request."""
+
+    def __init__(self, currency_name: str, precision: str):
+        """Initialize the group."""
+        self.currency_name = currency_name
+        self.precision = precision
+        self.subscribers = {}
+        self.data = {}
+        self.last_fetch = None
+        self.fetched_at = None
+        self.stale = False
+        # The subscriber whose last fetch sent a request, instead of being
+        # served from the fresh cache or coalesced
+        self.requested_by = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def snapshot_key(self) -> str:
+        """Return the key of the group in the snapshot store."""
+        return f"{self.currency_name}/{self.precision}"
+
+    @property
+    def cryptocurrency_ids(self) -> list[str]:
+        """Return the union of the ids requested by all subscribers."""
+        return sorted(set().union(*self.subscribers.values()))
+
+    def id_chunks(self) -> list[list[str]]:
+        """Split the ids into evenly sized chunks that fit in one page and URL."""
+        ids = self.cryptocurrency_ids
+        if not ids:
+            return []
+        total_length = sum(len(coin_id) + 1 for coin_id in ids)
+        count = max(
+            math.ceil(len(ids) / MARKETS_PER_PAGE),
+            math.ceil(total_length / MAX_IDS_LENGTH),
+        )
+        size = math.ceil(len(ids) / count)
+        return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+    def path(self, ids: list[str]) -> str:
+        """Build the /coins/markets request path for some ids."""
+        params = [
+            ("vs_currency", self.currency_name),
+            ("ids", ",".join(ids)),
+            ("price_change_percentage", "1h,24h,7d,14d,30d,1y"),
+            ("per_page", MARKETS_PER_PAGE),
+            ("page", 1),
+        ]
+        if self.precision:
+            params.append(("precision", self.precision))
+        return f"coins/markets?{urlencode(params)}"
+
+    async def async_parse(self, response: ClientResponse) -> dict:
+        """Return the response as a {coin id: MarketQuote} map.
+
+        The coins are parsed one by one while the body is read, so neither
+        the whole body nor the whole decoded list is held in memory.
+        """
+        data = {}
+        async for coin in async_iter_json_array(response.content):
+            data[coin["id"]] = MarketQuote.from_api(coin)
+        return data
+
+    def to_snapshot(self, data: dict) -> dict:
+        """Return the data in a JSON serializable form."""
+        return {coin_id: quote.as_dict() for coin_id, quote in data.items()}
+
+    def from_snapshot(self, data: dict) -> dict:
+        """Return the data stored by `to_snapshot`."""
+        return {
+            coin_id: MarketQuote.from_dict(values) for coin_id, values in data.items()
+        }
+
+    def slice(self, coordinator, data: dict) -> dict:
+        """Return the part of the group data a coordinator asked for."""
+        return {
+            coin_id: data[coin_id]
+            for coin_id in coordinator.cryptocurrency_id_list
+            if coin_id in data
+        }
+
+    def fan_out(self, coordinator, data: dict) -> None:
+        """Hand fresh data to a subscriber that did not request it."""
+        coordinator.async_set_updated_data(data)
+
+
+class TopMarketsGroup(MarketsGroup):
+    """Coordinators that follow the top coins by market cap in one currency.
+
+    One request for the longest top serves all subscribers, the data keeps
+    the order of the ranking.
+    """
+
+    @property
+    def snapshot_key(self) -> str:
+        """Return the key of the group in the snapshot store."""
+        return f"top/{self.currency_name}/{self.precision}"
+
+    @property
+    def cryptocurrency_ids(self) -> list[str]:
+        """Return the ids of the last ranking."""
+        return list(self.data)
+
+    def id_chunks(self) -> list[list[str]]:
+        """Return a single chunk, the ranking needs no ids."""
+        return [[]] if self.subscribers else []
+
+    def path(self, ids: list[str]) -> str:
+        """Build the /coins/markets request path for the top coins."""
+        params = [
+            ("vs_currency", self.currency_name),
+            ("order", "market_cap_desc"),
+            ("price_change_percentage", "1h,24h,7d,14d,30d,1y"),
+            (
+                "per_page",
+                max(coordinator.top_count for coordinator in self.subscribers),
+            ),
+            ("page", 1),
+        ]
+        if self.precision:
+            params.append(("precision", self.precision))
+        return f"coins/markets?{urlencode(params)}"
+
+    def slice(self, coordinator, data: dict) -> dict:
+        """Return the top coins of a coordinator, in the order of the ranking."""
+        return dict(islice(data.items(), coordinator.top_count))
+
+
+class PricesGroup(MarketsGroup):
+    """Coordinators that share one /simple/price request per precision."""
+
+    def __init__(self, precision: str):
+        """Initialize the group."""
+        super().__init__("", precision)
+
+    @property
+    def snapshot_key(self) -> str:
+        """Return the key of the group in the snapshot store."""
+        return f"simple_price/{self.precision}"
+
+    @property
+    def currencies(self) -> list[str]:
+        """Return the union of the extra currencies of all subscribers."""
+        return sorted(
+            {
+                currency.lower()
+                for subscriber in self.subscribers
+                for currency in subscriber.extra_currencies
+            }
+        )
+
+    def path(self, ids: list[str]) -> str:
+        """Build the /simple/price request path for some ids."""
+        params = [
+            ("ids", ",".join(ids)),
+            ("vs_currencies", ",".join(self.currencies)),
+            ("include_market_cap", "true"),
+            ("include_24hr_vol", "true"),
+            ("include_24hr_change", "true"),
+        ]
+        if self.precision:
+            params.append(("precision", self.precision))
+        return f"simple/price?{urlencode(params)}"
+
+    async def async_parse(self, response: ClientResponse) -> dict:
+        """Return the response, a {coin id: {field: value}} map."""
+        return await response.json()
+
+    def to_snapshot(self, data: dict) -> dict:
+        """Return the data in a JSON serializable form."""
+        return data
+
+    def from_snapshot(self, data: dict) -> dict:
+        """Return the data stored by `to_snapshot`."""
+        return data
+
+    def fan_out(self, coordinator, data: dict) -> None:
+        """Hand fresh prices to a subscriber that did not request them."""
+        coordinator.async_set_prices(data)
+
+
+class CryptoMarketsFetcher:
+    """Fetch market data once per (vs_currency, precision) for all entries."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        providers: ProviderPool,
+        store: CryptoInfoStore,
+    ):
+        """Initialize the fetcher."""
+        self._hass = hass
+        self.providers = providers
+        self._store = store
+        self.http_cache = HttpCache()
+        self.metrics = FetchMetrics()
+        self._groups: dict[tuple[str, str], MarketsGroup] = {}
+        self._price_groups: dict[str, PricesGroup] = {}
+
+    @staticmethod
+    def _group_key(coordinator) -> tuple[str, str, bool]:
+        return (
+            coordinator.currency_name.lower(),
+            coordinator.precision,
+            bool(coordinator.top_count),
+        )
+
+    def _groups_of(self, coordinator) -> list[MarketsGroup]:
+        groups = [self._groups.get(self._group_key(coordinator))]
+        if coordinator.extra_currencies:
+            groups.append(self._price_groups.get(coordinator.precision))
+        return [group for group in groups if group is not None]
+
+    def _add_subscriber(self, groups: dict, key, factory, coordinator) -> None:
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = factory()
+            # Start from the last known data until the first fetch is done
+            snapshot = self._store.get_snapshot(group.snapshot_key)
+            if snapshot:
+                timestamp, data = snapshot
+                group.data = group.from_snapshot(data)
+                group.fetched_at = timestamp
+                group.stale = True
+                _LOGGER.debug(f"Loaded snapshot for {key} from {timestamp}")
+        group.subscribers[coordinator] = set(coordinator.cryptocurrency_id_list)
+        _LOGGER.debug(
+            f"Subscribed {coordinator.id_name} to {key}, ids: {group.cryptocurrency_ids}"
+        )
+
+    def subscribe(self, coordinator) -> None:
+        """Add the ids of a coordinator to its groups."""
+        currency_name, precision, top = key = self._group_key(coordinator)
+        group_class = TopMarketsGroup if top else MarketsGroup
+        self._add_subscriber(
+            self._groups,
+            key,
+            lambda: group_class(currency_name, precision),
+            coordinator,
+        )
+        if coordinator.extra_currencies:
+            precision = coordinator.precision
+            self._add_subscriber(
+                self._price_groups,
+                precision,
+                lambda: PricesGroup(precision),
+                coordinator,
+            )
+
+    def unsubscribe(self, coordinator) -> None:
+        """Remove a coordinator from its groups, dropping empty groups."""
+        for groups in (self._groups, self._price_groups):
+            for key, group in list(groups.items()):
+                if group.subscribers.pop(coordinator, None) is None:
+                    continue
+                if not group.subscribers:
+                    del groups[key]
+                _LOGGER.debug(f"Unsubscribed {coordinator.id_name} from {key}")
+
+    def cached(self, coordinator) -> dict | None:
+        """Return the last group data for a coordinator, if it covers its ids."""
+        group = self._groups.get(self._group_key(coordinator))
+        if group is None or not group.data:
+            return None
+        data = group.slice(coordinator, group.data)
+        if len(data) < len(coordinator.cryptocurrency_id_list):
+            return None
+        return data
+
+    def cached_prices(self, coordinator) -> dict:
+        """Return the last /simple/price data for a coordinator."""
+        group = self._price_groups.get(coordinator.precision)
+        if group is None:
+            return {}
+        return group.slice(coordinator, group.data)
+
+    def fetched_at(self, coordinator) -> datetime | None:
+        """Return when the markets data of a coordinator was fetched."""
+        group = self._groups.get(self._group_key(coordinator))
+        return group.fetched_at if group else None
+
+    def requested(self, coordinator) -> bool:
+        """Return True if the last markets fetch of a coordinator sent a request."""
+        group = self._groups.get(self._group_key(coordinator))
+        return group is not None and group.requested_by is coordinator
+
+    def diagnostics(self) -> dict:
+        """Return the request, cache and rate limit metrics."""
+        cache = self.http_cache
+        return {
+            **self.metrics.as_dict(),
+            "cache": {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "not_modified": cache.not_modified,
+            },
+            "providers": {
+                provider.name: provider.diagnostics()
+                for provider in self.providers.providers
+            },
+            "groups": {
+                group.snapshot_key: {
+                    "ids": len(group.cryptocurrency_ids),
+                    "subscribers": len(group.subscribers),
+                    "stale": group.stale,
+                    "fetched_at": group.fetched_at,
+                }
+                for groups in (self._groups, self._price_groups)
+                for group in groups.values()
+            },
+        }
+
+    def is_stale(self, coordinator) -> bool:
+        """Return True if the last request for a group of a coordinator failed."""
+        return any(group.stale for group in self._groups_of(coordinator))
+
+    async def _async_request(self, path: str, parse, use_cache: bool = True):
+        """Request a path and return the response parsed by the `parse` coroutine.
+
+        Fresh cached responses are returned without a request; otherwise the
+        request goes to the healthiest provider, is conditional and a 304
+        reuses the cached parsed data. Rate limits and server errors open the
+        circuit breaker of the provider.
+        """
+        cache = self.http_cache if use_cache else None
+        data = cache.fresh(path) if cache else None
+        if data is not None:
+            _LOGGER.debug(f"Using cached response for: {path}")
+            return data
+
+        provider = self.providers.choose()
+        if provider is None or not provider.circuit_breaker.allow_request():
+            _LOGGER.debug(
+                f"All providers are backing off, retry in {self.providers.retry_in:.0f} seconds"
+            )
+            self.metrics.skipped += 1
+            return None
+
+        breaker = provider.circuit_breaker
+        metrics = self.metrics
+        url = provider.url(path)
+        # True if this is the trial request of a half open circuit
+        trial = breaker.trial_running
+
+        try:
+            # Wait for a free slot in the request budget of the provider
+            await provider.rate_limiter.acquire()
+            if not breaker.allow_queued_request(trial):
+                # The circuit opened while the request was waiting
+                _LOGGER.debug(
+                    f"{provider.name} is backing off, dropped queued request: {url}"
+                )
+                metrics.skipped += 1
+                return None
+            # A queued request can have become the trial request meanwhile
+            trial = breaker.trial_running
+
+            _LOGGER.debug(f"Fetch data from {provider.name}: {url}")
+            metrics.requests += 1
+            started = time.monotonic()
+            session = aiohttp_client.async_get_clientsession(self._hass)
+            headers = provider.headers()
+            if cache:
+                headers.update(cache.request_headers(path))
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                hold = parse_retry_after(response.headers)
+                if cache and response.status == 304:
+                    data = cache.revalidated(path, response.headers)
+                else:
+                    data = None
+                if data is None:
+                    data = await parse(response)
+                    if cache:
+                        cache.store(path, response.headers, data)
+                metrics.payload_size.observe(response.content.total_bytes)
+            latency = time.monotonic() - started
+            metrics.latency.observe(latency)
+        except ClientResponseError as err:
+            metrics.failures += 1
+            if err.status == 429 or err.status >= 500:
+                provider.health.record(None, False)
+                delay = breaker.record_failure(
+                    parse_retry_after(err.headers or {}), rate_limited=err.status == 429
+                )
+                _LOGGER.warning(
+                    f"Error fetching data from {provider.name}: HTTP {err.status}, backing off for {delay:.0f} seconds"
+                )
+            else:
+                # A client error, like an unknown coin id, is no fault of the
+                # provider, so it doesn't count in its health or its backoff
+                if trial:
+                    breaker.abort_trial()
+                _LOGGER.error("Error fetching data from %s: %s", provider.name, err)
+            return None
+        except (ClientError, TimeoutError) as err:
+            metrics.failures += 1
+            provider.health.record(None, False)
+            delay = breaker.record_failure()
+            _LOGGER.error(
+                f"Error fetching data from {provider.name}: {err}, backing off for {delay:.0f} seconds"
+            )
+            return None
+        except ValueError as err:
+            metrics.failures += 1
+            provider.health.record(None, False)
+            if trial:
+                breaker.abort_trial()
+            _LOGGER.error("Error fetching data from %s: %s", provider.name, err)
+            return None
+        except asyncio.CancelledError:
+            if trial:
+                breaker.abort_trial()
+            raise
+
+        breaker.record_success(hold)
+        provider.health.record(latency, True)
+        return data
+
+    async def async_fetch(self, coordinator) -> dict | None:
+        """Fetch the markets group of a coordinator and fan the result out.
+
+        Returns the slice of the data for the calling coordinator, or None
+        when the request failed or the circuit breaker is open.
+        """
+        group = self._groups.get(self._group_key(coordinator))
+        return await self._async_fetch_group(group, coordinator)
+
+    async def async_fetch_prices(self, coordinator) -> dict | None:
+        """Fetch the /simple/price group of a coordinator and fan the result out."""
+        group = self._price_groups.get(coordinator.precision)
+        return await self._async_fetch_group(group, coordinator)
+
+    async def async_fetch_chart(
+        self,
+        cryptocurrency_id: str,
+        currency_name: str,
+        start: float,
+        end: float,
+        precision: str = "",
+    ) -> list[tuple[float, float]] | None:
+        """Fetch the price history of a coin from /market_chart/range.
+
+        The ranges are never requested twice, so the response isn't cached.
+        """
+        params = [
+            ("vs_currency", currency_name.lower()),
+            ("from", int(start)),
+            ("to", int(end)),
+        ]
+        if precision:
+            params.append(("precision", precision))
+        path = (
+            f"coins/{quote(cryptocurrency_id)}/market_chart/range?{urlencode(params)}"
+        )
+        return await self._async_request(path, _async_parse_chart, use_cache=False)
+
+    async def async_fetch_coin_list(self) -> list[tuple[str, str, str]] | None:
+        """Fetch the (id, symbol, name) of all coins from /coins/list."""
+        return await self._async_request(
+            "coins/list", _async_parse_coin_list, use_cache=False
+        )
+
+    async def _async_fetch_group(
+        self, group: MarketsGroup | None, coordinator
+    ) -> dict | None:
+        if group is None:
+            return None
+
+        requested_at = time.monotonic()
+        async with group.lock:
+            # Another subscriber fetched while we were waiting for the lock
+            if group.last_fetch is not None and group.last_fetch >= requested_at:
+                self.metrics.coalesced += 1
+                return group.slice(coordinator, group.data)
+
+            group.requested_by = None
+            chunks = group.id_chunks()
+            if not chunks:
+                # No subscriber has ids to fetch yet, like a top list that
+                # isn't ranked, so there is nothing to miss
+                return group.slice(coordinator, group.data)
+            cache = self.http_cache
+            requested = not all(cache.is_fresh(group.path(ids)) for ids in chunks)
+            results = await asyncio.gather(
+                *(
+                    self._async_request(group.path(ids), group.async_parse)
+                    for ids in chunks
+                )
+            )
+            if all(result is None for result in results):
+                # Keep serving the cached data, marked as stale
+                group.stale = True
+                return None
+
+            group.stale = False
+            if len(results) == 1:
+                # A single page, reuse the parsed map as is
+                data = results[0]
+            else:
+                data = {}
+                for ids, result in zip(chunks, results):
+                    if result is None:
+                        group.stale = True
+                        data.update(
+                            (coin_id, group.data[coin_id])
+                            for coin_id in ids
+                            if coin_id in group.data
+                        )
+                    else:
+                        data.update(result)
+            group.data = data
+            group.last_fetch = time.monotonic()
+            group.fetched_at = dt_util.utcnow()
+            if requested:
+                group.requested_by = coordinator
+            self._store.set_snapshot(group.snapshot_key, group.to_snapshot(data))
+
+        for subscriber in list(group.subscribers):
+            if subscriber is not coordinator:
+                group.fan_out(subscriber, group.slice(subscriber, group.data))
+
+        return group.slice(coordinator, group.data)
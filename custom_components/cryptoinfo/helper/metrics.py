@@ -0,0 +1,95 @@
+"""Performance metrics for CryptoInfo."""
+
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PAYLOAD_BUCKETS = (1024, 10240, 102400, 1048576)
+
+
+class Histogram:
+    """Count of observed values per bucket, with their sum and maximum."""
+
+    __slots__ = ("bounds", "count", "counts", "maximum", "total")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        """Initialize the histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a value to its bucket."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def average(self) -> float:
+        """Return the average of the observed values."""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the histogram in a JSON serializable form."""
+        buckets = {
+            f"<={bound:g}": count for bound, count in zip(self.bounds, self.counts)
+        }
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "average": self.average,
+            "max": self.maximum,
+            "buckets": buckets,
+        }
+
+
+class FetchMetrics:
+    """Metrics of the requests the shared fetcher sends."""
+
+    def __init__(self):
+        """Initialize the metrics."""
+        self.requests = 0
+        self.failures = 0
+        # Requests not sent because the circuit breaker was open
+        self.skipped = 0
+        # Fetches answered by a fetch of another subscriber
+        self.coalesced = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.payload_size = Histogram(PAYLOAD_BUCKETS)
+
+    def as_dict(self) -> dict:
+        """Return the metrics in a JSON serializable form."""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "latency": self.latency.as_dict(),
+            "payload_size": self.payload_size.as_dict(),
+        }
+
+
+class CoordinatorMetrics:
+    """Metrics of the updates of one coordinator and its sensors."""
+
+    def __init__(self):
+        """Initialize the metrics."""
+        self.updates = 0
+        # Updates that kept the previous data because no fetch succeeded
+        self.skipped_updates = 0
+        self.update_latency = Histogram(LATENCY_BUCKETS)
+        self.entity_writes = 0
+        self.skipped_writes = 0
+
+    def as_dict(self) -> dict:
+        """Return the metrics in a JSON serializable form."""
+        return {
+            "updates": self.updates,
+            "skipped_updates": self.skipped_updates,
+            "update_latency": self.update_latency.as_dict(),
+            "entity_writes": self.entity_writes,
+            "skipped_writes": self.skipped_writes,
+        }
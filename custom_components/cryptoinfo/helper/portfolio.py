@@ -0,0 +1,131 @@
+"""Portfolio totals over the holdings of all CryptoInfo entries."""
+
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+
+def change_amount(value: float, change_percentage: float | None) -> float:
+    """Return the part of a value that was gained in the last 24 hours."""
+    if not change_percentage:
+        return 0.0
+    if change_percentage <= -100:
+        return value
+    return value - value / (1 + change_percentage / 100)
+
+
+class PortfolioTotals:
+    """Total value and 24h change of the holdings in one currency."""
+
+    __slots__ = ("change", "holdings", "value")
+
+    def __init__(self):
+        """Initialize the totals."""
+        self.value = 0.0
+        self.change = 0.0
+        self.holdings = 0
+
+    @property
+    def change_percentage(self) -> float | None:
+        """Return the 24h change relative to the value a day ago."""
+        previous = self.value - self.change
+        return self.change / previous * 100 if previous else None
+
+
+class Portfolio:
+    """Holdings of all entries with totals per currency.
+
+    Every update of an entry only applies the holdings that changed to the
+    totals, and the sensors of a currency are notified once per event loop
+    iteration, however many entries updated in it.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the portfolio."""
+        self._hass = hass
+        # (coin id, currency) -> (value, 24h change) per entry
+        self._holdings: dict[str, dict[tuple[str, str], tuple[float, float]]] = {}
+        self.totals: dict[str, PortfolioTotals] = {}
+        self._listeners: dict[str, list[Callable[[], None]]] = {}
+        self._dirty: set[str] = set()
+        self._flush_handle = None
+        # Entries that can create the sensors of a currency, one of them owns them
+        self._entries: dict[str, tuple[set[str], Callable[[str], None]]] = {}
+        self._owners: dict[str, str] = {}
+
+    @callback
+    def async_add_entry(
+        self,
+        entry_id: str,
+        currencies: set[str],
+        create_sensors: Callable[[str], None],
+    ) -> None:
+        """Add an entry, creating the sensors of its currencies that have none."""
+        self._entries[entry_id] = (currencies, create_sensors)
+        for currency in currencies:
+            if currency not in self._owners:
+                self._owners[currency] = entry_id
+                create_sensors(currency)
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Remove the holdings of an entry and hand over its sensors."""
+        self._entries.pop(entry_id, None)
+        self.async_update(entry_id, {})
+        self._holdings.pop(entry_id, None)
+        for currency, owner in list(self._owners.items()):
+            if owner != entry_id:
+                continue
+            del self._owners[currency]
+            for other_id, (currencies, create_sensors) in self._entries.items():
+                if currency in currencies:
+                    self._owners[currency] = other_id
+                    create_sensors(currency)
+                    break
+
+    @callback
+    def async_update(
+        self, entry_id: str, holdings: dict[tuple[str, str], tuple[float, float]]
+    ) -> None:
+        """Apply the holdings of an entry that changed to the totals."""
+        previous = self._holdings.get(entry_id, {})
+        for key, holding in holdings.items():
+            old = previous.get(key)
+            if old == holding:
+                continue
+            totals = self.totals.setdefault(key[1], PortfolioTotals())
+            if old is None:
+                totals.holdings += 1
+                old = (0.0, 0.0)
+            totals.value += holding[0] - old[0]
+            totals.change += holding[1] - old[1]
+            self._dirty.add(key[1])
+        for key in previous.keys() - holdings.keys():
+            totals = self.totals[key[1]]
+            totals.holdings -= 1
+            if totals.holdings:
+                totals.value -= previous[key][0]
+                totals.change -= previous[key][1]
+            else:
+                # Start over from exact zeros instead of the rounding errors
+                totals.value = totals.change = 0.0
+            self._dirty.add(key[1])
+        self._holdings[entry_id] = holdings
+        if self._dirty and self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_soon(self._flush)
+
+    @callback
+    def async_add_listener(
+        self, currency: str, listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call a listener when the totals of a currency changed."""
+        listeners = self._listeners.setdefault(currency, [])
+        listeners.append(listener)
+        return lambda: listeners.remove(listener)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        for currency in dirty:
+            for listener in list(self._listeners.get(currency, ())):
+                listener()
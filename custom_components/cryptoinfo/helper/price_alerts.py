@@ -0,0 +1,189 @@
+"""Price alerts with indexed thresholds for CryptoInfo."""
+
+from bisect import bisect_left, bisect_right
+
+from .market_quote import MarketQuote
+
+EVENT_THRESHOLD_CROSSED = "cryptoinfo_threshold_crossed"
+# Band around a threshold the value has to leave before it crosses again,
+# in percent of the threshold for prices and in points for 24h changes
+ALERT_HYSTERESIS = 0.5
+# Minimum seconds between two events of one threshold
+ALERT_COOLDOWN = 900
+
+
+class ThresholdSet:
+    """Sorted thresholds of one value, with hysteresis and a cooldown.
+
+    Every threshold remembers on which side of it the value is. A new value
+    can only have crossed the thresholds between it and the previous value,
+    which are found by bisecting, so an update costs O(log n) plus the
+    crossings. After a crossing the threshold is disarmed until the value
+    moved a band away from it, so jitter around a threshold fires once.
+    """
+
+    def __init__(self, thresholds: list[float], band: float, relative: bool):
+        """Initialize the set, `band` is a percentage if `relative`."""
+        self.thresholds = sorted(set(thresholds))
+        self._band = band
+        self._relative = relative
+        self.value: float | None = None
+        self._above: list[bool] = []
+        self._disarmed: set[int] = set()
+        self._fired: dict[int, float] = {}
+        # True if the state changed since the last `as_dict`
+        self.changed = False
+
+    def band(self, threshold: float) -> float:
+        """Return the hysteresis band around a threshold."""
+        return abs(threshold) * self._band / 100 if self._relative else self._band
+
+    def update(self, value: float, now: float) -> list[tuple[float, str]]:
+        """Return the (threshold, "up" or "down") crossings of a new value.
+
+        The crossings are in the order the value passed the thresholds.
+        """
+        last = self.value
+        if value == last and not self._disarmed:
+            return []
+        self.value = value
+        if last is None or not self._above:
+            self._above = [value >= threshold for threshold in self.thresholds]
+            self.changed = True
+            return []
+        crossings = []
+        # Disarmed thresholds are few, they can re-arm or cross anywhere
+        for index in list(self._disarmed):
+            threshold = self.thresholds[index]
+            band = self.band(threshold)
+            if value >= threshold + band:
+                if self._above[index]:
+                    self._disarmed.discard(index)
+                    self.changed = True
+                else:
+                    self._cross(index, now, crossings)
+            elif value <= threshold - band:
+                if not self._above[index]:
+                    self._disarmed.discard(index)
+                    self.changed = True
+                else:
+                    self._cross(index, now, crossings)
+        low, high = (last, value) if last < value else (value, last)
+        start = bisect_left(self.thresholds, low)
+        end = bisect_right(self.thresholds, high, start)
+        for index in range(start, end):
+            if index not in self._disarmed and self._above[index] != (
+                value >= self.thresholds[index]
+            ):
+                self._cross(index, now, crossings)
+        crossings.sort(key=lambda crossing: crossing[0], reverse=value < last)
+        return crossings
+
+    def _cross(self, index: int, now: float, crossings: list) -> None:
+        above = not self._above[index]
+        self._above[index] = above
+        self._disarmed.add(index)
+        self.changed = True
+        fired = self._fired.get(index)
+        if fired is not None and now - fired < ALERT_COOLDOWN:
+            return
+        self._fired[index] = now
+        crossings.append((self.thresholds[index], "up" if above else "down"))
+
+    def as_dict(self) -> dict:
+        """Return the state in a JSON serializable form."""
+        self.changed = False
+        return {
+            "value": self.value,
+            "thresholds": (
+                {
+                    repr(threshold): [
+                        self._above[index],
+                        index in self._disarmed,
+                        self._fired.get(index),
+                    ]
+                    for index, threshold in enumerate(self.thresholds)
+                }
+                if self._above
+                else {}
+            ),
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restore the state, thresholds that were not stored start over."""
+        value = state.get("value")
+        if value is None:
+            return
+        self.value = value
+        stored = state.get("thresholds", {})
+        self._above = []
+        for index, threshold in enumerate(self.thresholds):
+            above, disarmed, fired = stored.get(
+                repr(threshold), [value >= threshold, False, None]
+            )
+            self._above.append(above)
+            if disarmed:
+                self._disarmed.add(index)
+            if fired is not None:
+                self._fired[index] = fired
+
+
+class PriceAlerts:
+    """The price and 24h change alerts of the coins of an entry."""
+
+    def __init__(self, alerts: dict[str, tuple[list[float], list[float]]]):
+        """Initialize from the price thresholds and 24h changes per coin."""
+        self._sets: dict[tuple[str, str], ThresholdSet] = {}
+        for coin_id, (prices, changes) in alerts.items():
+            if prices:
+                self._sets[(coin_id, "price")] = ThresholdSet(
+                    prices, ALERT_HYSTERESIS, True
+                )
+            if changes:
+                self._sets[(coin_id, "24h_change")] = ThresholdSet(
+                    [move for change in changes for move in (change, -change)],
+                    ALERT_HYSTERESIS,
+                    False,
+                )
+
+    @property
+    def changed(self) -> bool:
+        """Return True if the state should be saved."""
+        return any(thresholds.changed for thresholds in self._sets.values())
+
+    def update(self, quotes: dict[str, MarketQuote], now: float) -> list[dict]:
+        """Return the event data of the thresholds the new quotes crossed."""
+        events = []
+        for (coin_id, kind), thresholds in self._sets.items():
+            quote = quotes.get(coin_id)
+            if quote is None:
+                continue
+            value = quote.current_price if kind == "price" else quote.change_24h
+            if value is None:
+                continue
+            value = float(value)
+            for threshold, direction in thresholds.update(value, now):
+                events.append(
+                    {
+                        "cryptocurrency_id": coin_id,
+                        "type": kind,
+                        "threshold": threshold,
+                        "direction": direction,
+                        "value": value,
+                    }
+                )
+        return events
+
+    def as_dict(self) -> dict:
+        """Return the state in a JSON serializable form."""
+        return {
+            f"{coin_id}/{kind}": thresholds.as_dict()
+            for (coin_id, kind), thresholds in self._sets.items()
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restore the state saved with `as_dict`."""
+        for (coin_id, kind), thresholds in self._sets.items():
+            stored = state.get(f"{coin_id}/{kind}")
+            if stored:
+                thresholds.restore(stored)
@@ -0,0 +1,213 @@
+"""Price history ring buffer with rolling statistics for CryptoInfo."""
+
+from array import array
+from collections import deque
+from collections.abc import Iterable
+import math
+
+HISTORY_SIZE = 1440
+# Longest gap between two samples that is filled by interpolation, longer
+# gaps are outages without a backfill
+MAX_INTERPOLATION_GAP = 2 * 86400
+
+
+def resample(
+    samples: Iterable[tuple[float, float]], interval: float
+) -> list[tuple[float, float]]:
+    """Return one sample every `interval` seconds, from old to new.
+
+    The samples are placed on a grid that ends at the newest sample, with
+    the prices interpolated linearly between the samples around every grid
+    point. Backfilled points that are minutes to a day apart thus give one
+    sample per update just like recorded updates, so a window counts the
+    same time span in both.
+    """
+    samples = list(samples)
+    if len(samples) < 2:
+        return samples
+    first = samples[0][0]
+    last = samples[-1][0]
+    count = int((last - first) // interval)
+    result = []
+    index = 0
+    for step in range(count, -1, -1):
+        timestamp = last - step * interval
+        while samples[index + 1][0] < timestamp:
+            index += 1
+        start, start_price = samples[index]
+        end, end_price = samples[index + 1]
+        if end - start > MAX_INTERPOLATION_GAP and start < timestamp < end:
+            continue
+        if end > start:
+            price = start_price + (end_price - start_price) * (timestamp - start) / (
+                end - start
+            )
+        else:
+            price = end_price
+        result.append((timestamp, price))
+    return result
+
+
+class RollingWindow:
+    """Statistics over the last `size` prices, updated in O(1) per price."""
+
+    __slots__ = (
+        "_alpha",
+        "_count",
+        "_ema",
+        "_high",
+        "_low",
+        "_return_count",
+        "_return_squares",
+        "_return_sum",
+        "_sum",
+        "size",
+    )
+
+    def __init__(self, size: int):
+        """Initialize the window."""
+        self.size = size
+        self._alpha = 2 / (size + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._ema = None
+        # Monotonic queues of (index, price) for the rolling high and low
+        self._high: deque[tuple[int, float]] = deque()
+        self._low: deque[tuple[int, float]] = deque()
+        self._return_count = 0
+        self._return_sum = 0.0
+        self._return_squares = 0.0
+
+    def push(self, history: "PriceHistory", index: int, price: float, ret) -> None:
+        """Add the price at `index`, dropping the one that leaves the window."""
+        size = self.size
+        if index >= size:
+            self._sum -= history.price(index - size)
+        else:
+            self._count += 1
+        self._sum += price
+
+        self._ema = (
+            price
+            if self._ema is None
+            else self._ema + self._alpha * (price - self._ema)
+        )
+
+        oldest = index - size
+        while self._high and self._high[-1][1] <= price:
+            self._high.pop()
+        self._high.append((index, price))
+        if self._high[0][0] <= oldest:
+            self._high.popleft()
+        while self._low and self._low[-1][1] >= price:
+            self._low.pop()
+        self._low.append((index, price))
+        if self._low[0][0] <= oldest:
+            self._low.popleft()
+
+        # A window of n prices holds the n - 1 returns between them
+        if ret is not None:
+            self._return_count += 1
+            self._return_sum += ret
+            self._return_squares += ret * ret
+        if index >= size:
+            leaving = history.log_return(index - size + 1)
+            if leaving is not None:
+                self._return_count -= 1
+                self._return_sum -= leaving
+                self._return_squares -= leaving * leaving
+
+    @property
+    def sma(self) -> float | None:
+        """Return the simple moving average."""
+        return self._sum / self._count if self._count else None
+
+    @property
+    def ema(self) -> float | None:
+        """Return the exponential moving average."""
+        return self._ema
+
+    @property
+    def high(self) -> float | None:
+        """Return the highest price in the window."""
+        return self._high[0][1] if self._high else None
+
+    @property
+    def low(self) -> float | None:
+        """Return the lowest price in the window."""
+        return self._low[0][1] if self._low else None
+
+    @property
+    def volatility(self) -> float | None:
+        """Return the standard deviation of the log returns, in percent."""
+        n = self._return_count
+        if n < 2:
+            return None
+        variance = (self._return_squares - self._return_sum**2 / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0)) * 100
+
+
+class PriceHistory:
+    """Fixed-size ring buffer of (timestamp, price) samples of one coin.
+
+    The samples are kept in `array("d")` buffers, and every configured
+    window is updated incrementally when a sample is appended.
+    """
+
+    def __init__(self, windows: Iterable[int] = (), size: int = HISTORY_SIZE):
+        """Initialize the history."""
+        windows = sorted(set(windows))
+        # Keep one extra sample so the return leaving a window is still known
+        self.size = max([size, *(window + 1 for window in windows)])
+        self._timestamps = array("d", bytes(8 * self.size))
+        self._prices = array("d", bytes(8 * self.size))
+        self._next = 0
+        self.windows = {window: RollingWindow(window) for window in windows}
+
+    def __len__(self) -> int:
+        """Return the number of samples in the buffer."""
+        return min(self._next, self.size)
+
+    def price(self, index: int) -> float:
+        """Return the price of the sample with an absolute index."""
+        return self._prices[index % self.size]
+
+    def log_return(self, index: int) -> float | None:
+        """Return the log return from the previous sample to `index`."""
+        if index < 1:
+            return None
+        previous = self._prices[(index - 1) % self.size]
+        current = self._prices[index % self.size]
+        if previous <= 0 or current <= 0:
+            return None
+        return math.log(current / previous)
+
+    def append(self, timestamp: float, price: float) -> None:
+        """Add a sample, updating the rolling windows."""
+        index = self._next
+        ret = None
+        if index and price > 0:
+            previous = self._prices[(index - 1) % self.size]
+            if previous > 0:
+                ret = math.log(price / previous)
+        for window in self.windows.values():
+            window.push(self, index, price, ret)
+        slot = index % self.size
+        self._timestamps[slot] = timestamp
+        self._prices[slot] = price
+        self._next = index + 1
+
+    def samples(self) -> list[tuple[float, float]]:
+        """Return the samples from old to new."""
+        start = self._next - len(self)
+        return [
+            (self._timestamps[i % self.size], self._prices[i % self.size])
+            for i in range(start, self._next)
+        ]
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Return the timestamp of the newest sample."""
+        if not self._next:
+            return None
+        return self._timestamps[(self._next - 1) % self.size]
@@ -0,0 +1,181 @@
+"""Price providers with health based failover for CryptoInfo."""
+
+from abc import ABC, abstractmethod
+
+from ..const.const import API_ENDPOINT, PRO_API_ENDPOINT
+from .backoff import CircuitBreaker
+from .rate_limiter import RateLimiter
+
+# Seconds between requests to the Pro API, its plans allow 500+ a minute
+PRO_MIN_INTERVAL = 0.5
+# Weight of the newest request in the latency and error averages
+HEALTH_ALPHA = 0.2
+
+
+class ProviderHealth:
+    """Moving averages of the latency and the error rate of a provider."""
+
+    __slots__ = ("error_rate", "errors", "latency", "requests")
+
+    def __init__(self):
+        """Initialize the health."""
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, latency: float | None, ok: bool) -> None:
+        """Add the outcome of a request."""
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.error_rate += HEALTH_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + HEALTH_ALPHA * (latency - self.latency)
+            )
+
+    def as_dict(self) -> dict:
+        """Return the health in a JSON serializable form."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "latency": self.latency,
+        }
+
+
+class PriceProvider(ABC):
+    """An API that serves the CoinGecko endpoints and responses.
+
+    Every provider has its own rate limiter, circuit breaker and health, so
+    a throttled provider doesn't hold back the others. The request paths
+    and the parsing into MarketQuote records are shared by all providers.
+    """
+
+    name = ""
+
+    def __init__(self, rate_limiter: RateLimiter, circuit_breaker: CircuitBreaker):
+        """Initialize the provider."""
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.health = ProviderHealth()
+
+    @abstractmethod
+    def url(self, path: str) -> str:
+        """Return the absolute URL of a path with query."""
+
+    def headers(self) -> dict[str, str]:
+        """Return the headers to send with every request."""
+        return {}
+
+    @property
+    def available(self) -> bool:
+        """Return True if the circuit breaker lets a request through."""
+        breaker = self.circuit_breaker
+        state = breaker.state
+        if state == breaker.OPEN:
+            return False
+        return state == breaker.CLOSED or not breaker.trial_running
+
+    def score(self) -> float:
+        """Return the expected cost of a request, lower is better.
+
+        The average latency, inflated by the recent error rate, plus the
+        time the request would wait in the rate limiter queue.
+        """
+        latency = self.health.latency or 0.0
+        queue = self.rate_limiter.queue_depth * self.rate_limiter.interval
+        return latency * (1 + 10 * self.health.error_rate) + queue
+
+    def diagnostics(self) -> dict:
+        """Return the state of the provider."""
+        breaker = self.circuit_breaker
+        return {
+            "health": self.health.as_dict(),
+            "rate_limiter": {
+                "interval": self.rate_limiter.interval,
+                **self.rate_limiter.stats,
+            },
+            "circuit_breaker": {
+                "state": breaker.state,
+                "retry_in": breaker.retry_in,
+                "rate_limited": breaker.rate_limited_count,
+            },
+        }
+
+
+class CoinGeckoProvider(PriceProvider):
+    """The public CoinGecko API."""
+
+    name = "coingecko"
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL of a path with query."""
+        return f"{API_ENDPOINT}{path}"
+
+
+class CoinGeckoProProvider(PriceProvider):
+    """The CoinGecko Pro API, authenticated with an API key."""
+
+    name = "coingecko_pro"
+
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        """Initialize the provider."""
+        super().__init__(
+            rate_limiter or RateLimiter(PRO_MIN_INTERVAL),
+            circuit_breaker or CircuitBreaker(),
+        )
+        self.api_key = api_key
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL of a path with query."""
+        return f"{PRO_API_ENDPOINT}{path}"
+
+    def headers(self) -> dict[str, str]:
+        """Return the headers to send with every request."""
+        return {"x-cg-pro-api-key": self.api_key}
+
+
+class ProviderPool:
+    """Route every request to the healthiest available provider."""
+
+    def __init__(self, providers: list[PriceProvider]):
+        """Initialize the pool, the first provider is the default."""
+        self.providers = providers
+
+    def choose(self) -> PriceProvider | None:
+        """Return the available provider with the lowest score.
+
+        Providers without measurements yet score 0, so they get a request
+        to be measured; the order of the pool breaks ties.
+        """
+        available = [provider for provider in self.providers if provider.available]
+        if not available:
+            return None
+        return min(available, key=lambda provider: provider.score())
+
+    @property
+    def rate_limited_count(self) -> int:
+        """Return the number of rate limited requests of all providers."""
+        return sum(
+            provider.circuit_breaker.rate_limited_count for provider in self.providers
+        )
+
+    def rate_limiter_stats(self) -> dict[str, dict]:
+        """Return the rate limiter statistics of every provider."""
+        return {
+            provider.name: provider.rate_limiter.stats for provider in self.providers
+        }
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until any provider allows requests again."""
+        return min(provider.circuit_breaker.retry_in for provider in self.providers)
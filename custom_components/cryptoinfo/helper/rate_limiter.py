@@ -0,0 +1,112 @@
+"""Rate limiter for CryptoInfo API requests."""
+
+import asyncio
+from collections import deque
+import time
+
+
+class RateLimiter:
+    """Token bucket with a fair FIFO queue of waiting requests.
+
+    One token is refilled every `interval` seconds, up to `capacity` tokens.
+    Callers that find the bucket empty wait in arrival order instead of
+    skipping their update.
+    """
+
+    def __init__(self, interval: float, capacity: int = 1):
+        """Initialize the limiter."""
+        self._interval = max(interval, 0.0)
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._waiters: deque[asyncio.Future] = deque()
+        self._wake_handle: asyncio.TimerHandle | None = None
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Return the seconds between two tokens."""
+        return self._interval
+
+    @interval.setter
+    def interval(self, value: float) -> None:
+        self._refill()
+        self._interval = max(value, 0.0)
+        self._schedule_wake()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    @property
+    def stats(self) -> dict:
+        """Return queue depth and wait-time statistics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired": self._acquired,
+            "average_wait": self._total_wait / self._acquired if self._acquired else 0.0,
+            "max_wait": self._max_wait,
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._interval == 0:
+            self._tokens = float(self._capacity)
+        else:
+            elapsed = now - self._updated
+            self._tokens = min(
+                self._capacity, self._tokens + elapsed / self._interval
+            )
+        self._updated = now
+
+    def _record(self, started: float) -> None:
+        wait = time.monotonic() - started
+        self._acquired += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+    def _wake(self) -> None:
+        """Hand out available tokens to the waiters in FIFO order."""
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+            self._wake_handle = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._tokens -= 1
+            waiter.set_result(None)
+        self._schedule_wake()
+
+    def _schedule_wake(self) -> None:
+        if self._wake_handle is not None or not self._waiters:
+            return
+        delay = max((1 - self._tokens) * self._interval, 0.0)
+        loop = asyncio.get_running_loop()
+        self._wake_handle = loop.call_later(delay, self._wake)
+
+    async def acquire(self) -> None:
+        """Wait for a token."""
+        started = time.monotonic()
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(started)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._schedule_wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The token was handed to us, give it back
+                self._tokens = min(self._capacity, self._tokens + 1)
+                self._wake()
+            raise
+        self._record(started)
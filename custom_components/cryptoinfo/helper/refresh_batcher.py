@@ -0,0 +1,58 @@
+"""Batched on-demand refreshes for CryptoInfo."""
+
+import asyncio
+from collections.abc import Iterable
+
+from homeassistant.core import HomeAssistant
+
+from ..const.const import _LOGGER
+
+# Seconds to collect refresh requests before they are served together
+REFRESH_WINDOW = 0.5
+
+
+class RefreshBatcher:
+    """Serve all refresh requests of a short window with one refresh.
+
+    The coordinators of all requests in the window refresh together, so
+    coordinators that share a request in the fetcher are served by a single
+    fetch of their group; the fetches wait for the rate limiter like every
+    other request. Every caller returns when the fresh data has landed.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the batcher."""
+        self._hass = hass
+        self._pending: set = set()
+        self._waiting = 0
+        self._done: asyncio.Future | None = None
+        self.requests = 0
+        self.batches = 0
+
+    async def async_refresh(self, coordinators: Iterable) -> None:
+        """Refresh some coordinators together with the other requests."""
+        self.requests += 1
+        self._waiting += 1
+        self._pending.update(coordinators)
+        if self._done is None:
+            self._done = self._hass.loop.create_future()
+            self._hass.loop.call_later(REFRESH_WINDOW, self._start)
+        await asyncio.shield(self._done)
+
+    def _start(self) -> None:
+        coordinators, self._pending = self._pending, set()
+        done, self._done = self._done, None
+        _LOGGER.debug(
+            f"Refreshing {len(coordinators)} entries for {self._waiting} requests"
+        )
+        self._waiting = 0
+        self.batches += 1
+        self._hass.async_create_task(self._async_run(coordinators, done))
+
+    async def _async_run(self, coordinators: set, done: asyncio.Future) -> None:
+        try:
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+        finally:
+            done.set_result(None)
@@ -1,10 +1,22 @@
 """Storage helper for CryptoInfo."""
 
-from homeassistant.helpers.storage import Store
+import asyncio
+from datetime import datetime
+
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .history_file import HistoryFile
 
 STORAGE_VERSION = 1
 STORAGE_KEY = "cryptoinfo_data"
+SNAPSHOT_STORAGE_KEY = "cryptoinfo_snapshots"
+SNAPSHOT_SAVE_DELAY = 300
+HISTORY_DIRECTORY = "cryptoinfo_series"
+CATALOG_STORAGE_KEY = "cryptoinfo_catalog"
+ALERTS_STORAGE_KEY = "cryptoinfo_alerts"
+ALERTS_SAVE_DELAY = 10
 
 
 class CryptoInfoStore:
@@ -15,13 +27,107 @@ class CryptoInfoStore:
         self.hass = hass
         self.store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
         self.data = {"min_time_between_requests": 1.0}
+        self.snapshot_store = Store(hass, STORAGE_VERSION, SNAPSHOT_STORAGE_KEY)
+        self.snapshots = {}
+        self._history_lock = asyncio.Lock()
+        self.catalog_store = Store(hass, STORAGE_VERSION, CATALOG_STORAGE_KEY)
+        self.alerts_store = Store(hass, STORAGE_VERSION, ALERTS_STORAGE_KEY)
+        self.alerts = {}
 
     async def async_load(self) -> None:
         """Load the data from storage."""
         stored = await self.store.async_load()
         if stored:
             self.data = stored
+        snapshots = await self.snapshot_store.async_load()
+        if snapshots:
+            self.snapshots = snapshots
+        alerts = await self.alerts_store.async_load()
+        if alerts:
+            self.alerts = alerts
+
+    def get_snapshot(self, key: str) -> tuple[datetime, dict] | None:
+        """Return the timestamp and market data of the last good fetch."""
+        snapshot = self.snapshots.get(key)
+        if not snapshot:
+            return None
+        return dt_util.parse_datetime(snapshot["timestamp"]), snapshot["data"]
+
+    def set_snapshot(self, key: str, data: dict) -> None:
+        """Remember the market data of a good fetch, saving it debounced."""
+        self.snapshots[key] = {"timestamp": dt_util.utcnow().isoformat(), "data": data}
+        self.snapshot_store.async_delay_save(
+            lambda: self.snapshots, SNAPSHOT_SAVE_DELAY
+        )
+
+    def get_alert_state(self, key: str) -> dict:
+        """Return the state of the price alerts of an entry."""
+        return self.alerts.get(key, {})
+
+    def set_alert_state(self, key: str, state: dict | None) -> None:
+        """Remember the state of the price alerts of an entry, saving it debounced."""
+        if state is None:
+            if self.alerts.pop(key, None) is None:
+                return
+        else:
+            self.alerts[key] = state
+        self.alerts_store.async_delay_save(lambda: self.alerts, ALERTS_SAVE_DELAY)
+
+    async def async_load_catalog(self) -> tuple[datetime, list] | None:
+        """Return the timestamp and the (id, symbol, name) list of the catalog."""
+        catalog = await self.catalog_store.async_load()
+        if not catalog:
+            return None
+        return dt_util.parse_datetime(catalog["timestamp"]), catalog["coins"]
+
+    async def async_save_catalog(self, coins: list) -> None:
+        """Save the coin catalog."""
+        await self.catalog_store.async_save(
+            {"timestamp": dt_util.utcnow().isoformat(), "coins": coins}
+        )
 
     async def async_save(self) -> None:
         """Save data to storage."""
         await self.store.async_save(self.data)
+
+    def history_file(self, key: str) -> HistoryFile:
+        """Return the binary price history file of a coin."""
+        return HistoryFile(
+            self.hass.config.path(
+                STORAGE_DIR, HISTORY_DIRECTORY, f"{key.replace('/', '_')}.f64"
+            )
+        )
+
+    async def async_get_history_bounds(self, key: str) -> tuple[float, float] | None:
+        """Return the first and last timestamp in the history of a coin."""
+        async with self._history_lock:
+            return await self.hass.async_add_executor_job(self.history_file(key).bounds)
+
+    async def async_get_history(
+        self, key: str, since: float | None = None
+    ) -> list[tuple[float, float]]:
+        """Return the stored (timestamp, price) samples of a coin."""
+        async with self._history_lock:
+            return await self.hass.async_add_executor_job(
+                self.history_file(key).read, since
+            )
+
+    async def async_append_history(
+        self, samples: dict[str, list[tuple[float, float]]]
+    ) -> None:
+        """Append new samples to the history of some coins."""
+        async with self._history_lock:
+            await self.hass.async_add_executor_job(self._append_history, samples)
+
+    def _append_history(self, samples: dict[str, list[tuple[float, float]]]) -> None:
+        for key, coin_samples in samples.items():
+            self.history_file(key).append(coin_samples)
+
+    async def async_merge_history(
+        self, key: str, samples: list[tuple[float, float]], since: float
+    ) -> list[tuple[float, float]]:
+        """Merge backfilled samples into the history of a coin."""
+        async with self._history_lock:
+            return await self.hass.async_add_executor_job(
+                self.history_file(key).merge, samples, since
+            )
@@ -0,0 +1,199 @@
+"""Exchange websocket ticker streams for CryptoInfo."""
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Callable
+import json
+import time
+from typing import Any
+
+from aiohttp import ClientError, WSMsgType
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
+
+from ..const.const import _LOGGER
+from .backoff import CircuitBreaker
+
+STREAM_THROTTLE = 1.0
+RECONNECT_BASE = 2.0
+RECONNECT_MAX = 300.0
+# A connection that lasted this long starts the backoff from the beginning
+STABLE_CONNECTION = 60.0
+
+
+class TickerProvider(ABC):
+    """Public ticker feed of an exchange."""
+
+    url = ""
+
+    @abstractmethod
+    def pair(self, symbol: str, currency_name: str) -> str:
+        """Return the trading pair of a coin symbol in a currency."""
+
+    @abstractmethod
+    def subscribe_messages(self, pairs: list[str]) -> list[dict]:
+        """Return the messages that subscribe to the tickers of some pairs."""
+
+    @abstractmethod
+    def parse(self, message: Any) -> list[tuple[str, float]]:
+        """Return the (pair, last price) updates in a message."""
+
+
+class BinanceProvider(TickerProvider):
+    """Binance individual symbol mini ticker streams."""
+
+    url = "wss://stream.binance.com:9443/ws"
+    # Binance has no USD pairs, USDT follows the dollar
+    _QUOTES = {"usd": "usdt"}
+
+    def pair(self, symbol: str, currency_name: str) -> str:
+        """Return the trading pair of a coin symbol in a currency."""
+        currency = currency_name.lower()
+        return f"{symbol}{self._QUOTES.get(currency, currency)}".upper()
+
+    def subscribe_messages(self, pairs: list[str]) -> list[dict]:
+        """Return the messages that subscribe to the tickers of some pairs."""
+        return [
+            {
+                "method": "SUBSCRIBE",
+                "params": [f"{pair.lower()}@miniTicker" for pair in pairs],
+                "id": 1,
+            }
+        ]
+
+    def parse(self, message: Any) -> list[tuple[str, float]]:
+        """Return the (pair, last price) updates in a message."""
+        if not isinstance(message, dict) or message.get("e") != "24hrMiniTicker":
+            return []
+        return [(message["s"], float(message["c"]))]
+
+
+class KrakenProvider(TickerProvider):
+    """Kraken websocket v2 ticker channel."""
+
+    url = "wss://ws.kraken.com/v2"
+
+    def pair(self, symbol: str, currency_name: str) -> str:
+        """Return the trading pair of a coin symbol in a currency."""
+        return f"{symbol}/{currency_name}".upper()
+
+    def subscribe_messages(self, pairs: list[str]) -> list[dict]:
+        """Return the messages that subscribe to the tickers of some pairs."""
+        return [
+            {
+                "method": "subscribe",
+                "params": {"channel": "ticker", "symbol": pairs},
+            }
+        ]
+
+    def parse(self, message: Any) -> list[tuple[str, float]]:
+        """Return the (pair, last price) updates in a message."""
+        if not isinstance(message, dict) or message.get("channel") != "ticker":
+            return []
+        return [
+            (ticker["symbol"], float(ticker["last"]))
+            for ticker in message.get("data") or []
+            if ticker.get("last") is not None
+        ]
+
+
+PROVIDERS: dict[str, type[TickerProvider]] = {
+    "binance": BinanceProvider,
+    "kraken": KrakenProvider,
+}
+
+
+class TickerStream:
+    """Persistent websocket to a ticker feed with throttled price updates.
+
+    Ticks are coalesced per coin and handed to `on_prices` at most once
+    per `throttle` seconds. Lost connections are reopened with a jittered
+    exponential backoff; `on_disconnect` is called every time one ends.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: TickerProvider,
+        pairs: dict[str, str],
+        on_prices: Callable[[dict[str, float]], None],
+        on_disconnect: Callable[[], None],
+        throttle: float = STREAM_THROTTLE,
+    ):
+        """Initialize the stream, `pairs` maps trading pairs to coin ids."""
+        self._hass = hass
+        self._provider = provider
+        self._pairs = pairs
+        self._on_prices = on_prices
+        self._on_disconnect = on_disconnect
+        self._throttle = throttle
+        self._pending: dict[str, float] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._backoff = CircuitBreaker(RECONNECT_BASE, RECONNECT_MAX)
+        self.ticks = 0
+        self.connected = False
+
+    async def async_run(self) -> None:
+        """Keep the stream connected until the task is cancelled."""
+        try:
+            while True:
+                connected_at = time.monotonic()
+                try:
+                    await self._async_listen()
+                except (ClientError, TimeoutError, ValueError) as err:
+                    _LOGGER.warning(f"Ticker stream error: {err}")
+                finally:
+                    self._disconnected()
+                if time.monotonic() - connected_at > STABLE_CONNECTION:
+                    self._backoff.record_success()
+                delay = self._backoff.record_failure()
+                _LOGGER.debug(f"Reconnecting ticker stream in {delay:.0f} seconds")
+                await asyncio.sleep(delay)
+        finally:
+            self._cancel_flush()
+
+    async def _async_listen(self) -> None:
+        session = aiohttp_client.async_get_clientsession(self._hass)
+        async with session.ws_connect(self._provider.url, heartbeat=30) as websocket:
+            for message in self._provider.subscribe_messages(list(self._pairs)):
+                await websocket.send_json(message)
+            self.connected = True
+            _LOGGER.debug(f"Ticker stream connected to {self._provider.url}")
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    self._handle(message.data)
+                elif message.type in (WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+
+    def _handle(self, message: str) -> None:
+        try:
+            updates = self._provider.parse(json.loads(message))
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.debug(f"Ignoring ticker stream message: {message}")
+            return
+        for pair, price in updates:
+            coin_id = self._pairs.get(pair)
+            if coin_id is None:
+                continue
+            self.ticks += 1
+            self._pending[coin_id] = price
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_later(self._throttle, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        prices, self._pending = self._pending, {}
+        if prices:
+            self._on_prices(prices)
+
+    def _cancel_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = {}
+
+    def _disconnected(self) -> None:
+        self.connected = False
+        self._cancel_flush()
+        self._on_disconnect()
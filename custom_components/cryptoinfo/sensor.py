@@ -4,26 +4,32 @@
 Author: Johnny Visser
 """
 
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from datetime import timedelta
+import time
 import urllib.error
-from urllib.parse import urlencode
-
-from aiohttp import ClientError
 
 from homeassistant import config_entries
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor.const import SensorStateClass
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client
+from homeassistant.const import EntityCategory
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
+from homeassistant.util import dt as dt_util
 
+from .config_validation import (
+    parse_adaptive_update_frequency,
+    parse_price_alerts,
+    parse_price_threshold,
+    parse_statistics_windows,
+)
 from .const.const import (
     _LOGGER,
-    API_ENDPOINT,
     ATTR_1H_CHANGE,
     ATTR_1Y_CHANGE,
     ATTR_7D_CHANGE,
@@ -40,23 +46,44 @@ from .const.const import (
     ATTR_CRYPTOCURRENCY_NAME,
     ATTR_CRYPTOCURRENCY_SYMBOL,
     ATTR_CURRENCY_NAME,
+    ATTR_HOLDINGS,
     ATTR_IMAGE,
     ATTR_LAST_UPDATE,
     ATTR_MARKET_CAP,
     ATTR_MULTIPLIER,
     ATTR_PRECISION,
     ATTR_RANK,
+    ATTR_STALE,
     ATTR_TOTAL_SUPPLY,
+    CONF_ADAPTIVE_UPDATE_FREQUENCY,
     CONF_CRYPTOCURRENCY_IDS,
     CONF_CURRENCY_NAME,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_EXCLUDE_STATIC_ATTRIBUTES,
     CONF_ID,
-    CONF_MIN_TIME_BETWEEN_REQUESTS,
     CONF_MULTIPLIERS,
+    CONF_PORTFOLIO,
     CONF_PRECISION,
+    CONF_PRICE_ALERTS,
+    CONF_PRICE_THRESHOLD,
+    CONF_STATISTICS_WINDOWS,
+    CONF_STREAMING_PROVIDER,
+    CONF_TOP_COUNT,
     CONF_UNIT_OF_MEASUREMENT,
     CONF_UPDATE_FREQUENCY,
+    DIAGNOSTIC_METRICS,
+    DOMAIN,
     SENSOR_PREFIX,
+    STATISTIC_TYPES,
 )
+from .helper.adaptive_interval import AdaptiveInterval
+from .helper.market_quote import FAST_FIELDS, MarketQuote
+from .helper.metrics import CoordinatorMetrics
+from .helper.portfolio import Portfolio, change_amount
+from .helper.price_alerts import EVENT_THRESHOLD_CROSSED, PriceAlerts
+from .helper.backfill import async_backfill_history
+from .helper.price_history import PriceHistory, resample
+from .helper.ticker_stream import PROVIDERS, TickerProvider, TickerStream
 
 
 async def async_setup_entry(
@@ -71,32 +98,121 @@ async def async_setup_entry(
 
     id_name = (config.get(CONF_ID) or "").strip()
     cryptocurrency_ids = config.get(CONF_CRYPTOCURRENCY_IDS).lower().strip()
-    currency_name = config.get(CONF_CURRENCY_NAME).strip()
-    unit_of_measurement = (config.get(CONF_UNIT_OF_MEASUREMENT) or "").strip()
+    currency_names = [
+        currency.strip()
+        for currency in config.get(CONF_CURRENCY_NAME).split(",")
+        if currency.strip()
+    ]
+    units_of_measurement = [
+        unit.strip() for unit in (config.get(CONF_UNIT_OF_MEASUREMENT) or "").split(",")
+    ]
     multipliers = config.get(CONF_MULTIPLIERS).strip()
     update_frequency = timedelta(minutes=(float(config.get(CONF_UPDATE_FREQUENCY))))
-    min_time_between_requests = timedelta(
-        minutes=(float(config.get(CONF_MIN_TIME_BETWEEN_REQUESTS)))
-    )
     precision = (config.get(CONF_PRECISION) or "").strip().lower()
+    price_threshold = parse_price_threshold(config.get(CONF_PRICE_THRESHOLD) or "")
+    statistics_windows = parse_statistics_windows(
+        config.get(CONF_STATISTICS_WINDOWS) or ""
+    )
+    # Follow the top coins by market cap instead of the configured ids
+    top_count = int(config.get(CONF_TOP_COUNT) or 0)
+    if top_count:
+        statistics_windows = []
+    adaptive_bounds = parse_adaptive_update_frequency(
+        config.get(CONF_ADAPTIVE_UPDATE_FREQUENCY) or ""
+    )
 
     # Create coordinator for centralized data fetching
     coordinator = CryptoDataCoordinator(
         hass,
         cryptocurrency_ids,
-        currency_name,
+        currency_names[0],
         update_frequency,
-        min_time_between_requests,
         id_name,
         precision,
+        currency_names[1:],
+        statistics_windows,
+        top_count,
+        adaptive_bounds,
     )
 
-    # Wait for coordinator to do first update
-    await coordinator.async_config_entry_first_refresh()
+    # Share one request per (currency, precision) with the other entries
+    fetcher = hass.data[DOMAIN].fetcher
+    fetcher.subscribe(coordinator)
+    config_entry.async_on_unload(lambda: fetcher.unsubscribe(coordinator))
+    coordinators = hass.data[DOMAIN].coordinators
+    coordinators[config_entry.entry_id] = coordinator
+    config_entry.async_on_unload(lambda: coordinators.pop(config_entry.entry_id, None))
+
+    alerts = parse_price_alerts(config.get(CONF_PRICE_ALERTS) or "")
+    if alerts:
+        coordinator.set_alerts(PriceAlerts(alerts), config_entry.entry_id)
+
+    if coordinator.history:
+        # Start from the stored history and fill its gaps in the background
+        await coordinator.async_load_history()
+        config_entry.async_create_background_task(
+            hass,
+            async_backfill_history(coordinator, fetcher, hass.data[DOMAIN].store),
+            f"cryptoinfo backfill {id_name}",
+        )
+
+    snapshot = fetcher.cached(coordinator)
+    if snapshot:
+        # Create the entities from the last known data and refresh in the background
+        coordinator.set_prices(fetcher.cached_prices(coordinator), snapshot)
+        coordinator.async_set_updated_data(snapshot)
+        config_entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"cryptoinfo refresh {id_name}"
+        )
+    else:
+        # Wait for coordinator to do first update
+        await coordinator.async_config_entry_first_refresh()
+
+    provider = PROVIDERS.get(config.get(CONF_STREAMING_PROVIDER) or "")
+    if provider is not None and not top_count:
+        # Sub-second prices from the exchange, CoinGecko fills the rest
+        stream = coordinator.create_ticker_stream(provider())
+        if stream is not None:
+            config_entry.async_create_background_task(
+                hass, stream.async_run(), f"cryptoinfo stream {id_name}"
+            )
+
+    sensor_class = (
+        CryptoinfoSensorRecorderFriendly
+        if config.get(CONF_EXCLUDE_STATIC_ATTRIBUTES)
+        else CryptoinfoSensor
+    )
+
+    def price_sensors(cryptocurrency_id: str, multiplier: str) -> list:
+        """Return the price sensors of a coin, one per currency."""
+        sensors = []
+        for j, currency_name in enumerate(currency_names):
+            # One unit per currency, additional currencies default to their code
+            unit_of_measurement = (
+                units_of_measurement[j]
+                if j < len(units_of_measurement)
+                else currency_name.upper()
+            )
+            sensors.append(
+                sensor_class(
+                    coordinator,
+                    cryptocurrency_id,
+                    currency_name,
+                    unit_of_measurement,
+                    multiplier,
+                    id_name,
+                    precision,
+                    price_threshold,
+                )
+            )
+        return sensors
 
     entities = []
     crypto_list = [crypto.strip() for crypto in cryptocurrency_ids.split(",")]
     multipliers_list = [multiplier.strip() for multiplier in multipliers.split(",")]
+    if top_count:
+        # The price sensors follow the ranking, see `async_update_ranking`
+        crypto_list = multipliers_list = []
 
     multipliers_length = len(multipliers_list)
     crypto_list_length = len(crypto_list)
@@ -109,161 +225,525 @@ async def async_setup_entry(
 
     for i, cryptocurrency_id in enumerate(crypto_list):
         try:
-            entities.append(
-                CryptoinfoSensor(
+            entities.extend(price_sensors(cryptocurrency_id, multipliers_list[i]))
+        except urllib.error.HTTPError as error:
+            _LOGGER.error(error.reason)
+            return
+
+        # Statistics are kept for the price in the first currency
+        for window in statistics_windows:
+            entities.extend(
+                CryptoinfoStatisticSensor(
                     coordinator,
                     cryptocurrency_id,
-                    currency_name,
-                    unit_of_measurement,
-                    multipliers_list[i],
+                    currency_names[0],
+                    units_of_measurement[0],
                     id_name,
-                    precision,
+                    statistic_type,
+                    window,
                 )
+                for statistic_type in STATISTIC_TYPES
             )
-        except urllib.error.HTTPError as error:
-            _LOGGER.error(error.reason)
-            return
+
+    if config.get(CONF_DIAGNOSTIC_SENSORS):
+        entities.extend(
+            CryptoinfoDiagnosticSensor(
+                coordinator, config_entry.entry_id, id_name, metric
+            )
+            for metric in DIAGNOSTIC_METRICS
+        )
 
     async_add_entities(entities)
+
+    if top_count:
+        ranked_sensors: dict[str, list[CryptoinfoSensor]] = {}
+        registry = er.async_get(hass)
+
+        @callback
+        def async_update_ranking(added: list[str], removed: list[str]) -> None:
+            """Add the sensors of the coins that entered the top, remove the others."""
+            for coin_id in removed:
+                for sensor in ranked_sensors.pop(coin_id, []):
+                    if sensor.registry_entry is not None:
+                        registry.async_remove(sensor.entity_id)
+                    else:
+                        hass.async_create_task(sensor.async_remove())
+            new_sensors = []
+            for coin_id in added:
+                ranked_sensors[coin_id] = price_sensors(coin_id, "1")
+                new_sensors.extend(ranked_sensors[coin_id])
+            if new_sensors:
+                async_add_entities(new_sensors)
+            _LOGGER.debug(
+                f"Top {top_count} of {id_name} changed, added: {added}, removed: {removed}"
+            )
+
+        coordinator.set_ranking_listener(async_update_ranking)
+
+        # Remove the sensors of coins that left the top while Home Assistant
+        # was not running
+        ranked_ids = {
+            sensor.unique_id
+            for sensors in ranked_sensors.values()
+            for sensor in sensors
+        }
+        price_prefix = SENSOR_PREFIX + (id_name + " " if id_name else "")
+        registry_entries = (
+            er.async_entries_for_config_entry(registry, config_entry.entry_id)
+            if ranked_ids
+            else []
+        )
+        for registry_entry in registry_entries:
+            unique_id = registry_entry.unique_id
+            if (
+                unique_id in ranked_ids
+                or not unique_id.startswith(price_prefix)
+                or unique_id.startswith(f"{SENSOR_PREFIX}portfolio ")
+                or not any(unique_id.endswith(currency) for currency in currency_names)
+            ):
+                continue
+            _LOGGER.debug(f"Removing {registry_entry.entity_id}, no longer in the top")
+            registry.async_remove(registry_entry.entity_id)
+
+    if config.get(CONF_PORTFOLIO) and not top_count:
+        portfolio = hass.data[DOMAIN].portfolio
+        units = {
+            currency_name.lower(): (
+                units_of_measurement[j]
+                if j < len(units_of_measurement)
+                else currency_name.upper()
+            )
+            for j, currency_name in enumerate(currency_names)
+        }
+        coordinator.holdings = {
+            cryptocurrency_id: float(multipliers_list[i])
+            for i, cryptocurrency_id in enumerate(crypto_list)
+        }
+        coordinator.portfolio_key = config_entry.entry_id
+
+        @callback
+        def create_portfolio_sensors(currency: str) -> None:
+            async_add_entities(
+                CryptoinfoPortfolioSensor(portfolio, currency, units[currency], change)
+                for change in (False, True)
+            )
+
+        portfolio.async_add_entry(
+            config_entry.entry_id, set(units), create_portfolio_sensors
+        )
+        config_entry.async_on_unload(
+            lambda: portfolio.async_remove_entry(config_entry.entry_id)
+        )
+        coordinator.update_portfolio()
     return
 
 
 class CryptoDataCoordinator(DataUpdateCoordinator):
     """Coordinator to fetch cryptocurrency data from CoinGecko."""
 
-    _active_coordinators = set()  # Set to track active coordinator IDs
-    _instance_count = 0  # Class variable to track number of coordinators
-    _last_update_time = None
-    _last_updated_id = None
-
     def __init__(
         self,
         hass: HomeAssistant,
         cryptocurrency_ids: str,
         currency_name: str,
         update_frequency: timedelta,
-        min_time_between_requests: timedelta,
         id_name: str,
         precision: str,
+        extra_currencies: list[str] | None = None,
+        statistics_windows: list[int] | None = None,
+        top_count: int = 0,
+        adaptive_bounds: tuple[float, float] | None = None,
     ):
-        """Initialize the coordinator."""
+        """Initialize the coordinator, with a `top_count` it follows the top coins."""
         super().__init__(
             hass,
             _LOGGER,
             name="Crypto Data",
             update_interval=update_frequency,
         )
-        self.instance_id = (
-            CryptoDataCoordinator._instance_count
-        )  # Assign current count as instance ID
-        CryptoDataCoordinator._instance_count += 1  # Increment the counter
-        CryptoDataCoordinator._active_coordinators.add(self.instance_id)
         self.cryptocurrency_ids = cryptocurrency_ids
+        # Ids that are not in the coin catalog would only waste request space
+        catalog = hass.data[DOMAIN].catalog
+        # In top mode the ids follow the ranking, see `_take_ranking`
+        self.top_count = top_count
+        self._ranking_listener = None
+        self.cryptocurrency_id_list = []
+        # The ranked ids the ranking listener was told about
+        self._ranked: list[str] = []
+        for crypto in [] if top_count else cryptocurrency_ids.split(","):
+            crypto = crypto.strip()
+            if catalog.is_known(crypto):
+                self.cryptocurrency_id_list.append(crypto)
+            else:
+                _LOGGER.warning(
+                    f"Unknown cryptocurrency id '{crypto}' is left out of the requests, "
+                    f"did you mean: {', '.join(catalog.suggest(crypto)) or '-'}"
+                )
         self.currency_name = currency_name
         self.id_name = id_name
-        self.min_time_between_requests = min_time_between_requests
         self.update_frequency = update_frequency
+        # Interval between the bounds (in minutes) that follows the market
+        self.adaptive_interval = None
+        if adaptive_bounds:
+            self.adaptive_interval = AdaptiveInterval(
+                adaptive_bounds[0] * 60,
+                adaptive_bounds[1] * 60,
+                update_frequency.total_seconds(),
+            )
+            self.update_interval = timedelta(seconds=self.adaptive_interval.interval)
         self.precision = precision
+        # Currencies priced through /simple/price next to the base currency
+        self.extra_currencies = extra_currencies or []
+        self.currency_data: dict[str, dict[str, MarketQuote]] = {}
+        self.metrics = CoordinatorMetrics()
+        # Latest prices from the optional exchange ticker stream
+        self.ticker_stream: TickerStream | None = None
+        self.stream_prices: dict[str, float] = {}
+        # Price sensors whose values are computed in one pass per update
+        self._value_sensors: list[CryptoinfoSensor] = []
+        # True if the data is cached from before a failed request
+        self.stale = False
+        # Time of the fetch of the current data, formatted once per fetch
+        self.last_update: str | None = None
+        self._fetched_at = None
+        # Price history with rolling statistics, see `async_load_history`
+        self.statistics_windows = statistics_windows or []
+        self.history: dict[str, PriceHistory] = {
+            coin_id: PriceHistory(self.statistics_windows)
+            for coin_id in self.cryptocurrency_id_list
+            if self.statistics_windows
+        }
+        self._recorded: dict[str, MarketQuote] = {}
+        # Multiplier per coin when the entry is part of the portfolio
+        self.holdings: dict[str, float] = {}
+        self.portfolio_key: str | None = None
+        # Price alerts and the key of their state in the store
+        self.alerts: PriceAlerts | None = None
+        self.alerts_key: str | None = None
 
-    def _markets_url(self) -> str:
-        """Build the CoinGecko /coins/markets request URL."""
-        params = [
-            ("vs_currency", self.currency_name),
-            ("ids", self.cryptocurrency_ids),
-            ("price_change_percentage", "1h,24h,7d,14d,30d,1y"),
-        ]
-        if self.precision:
-            params.append(("precision", self.precision))
-        return f"{API_ENDPOINT}coins/markets?{urlencode(params)}"
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Handle removal from Home Assistant."""
-        _LOGGER.debug(f"Removing coordinator {self.instance_id}")
-        CryptoDataCoordinator._active_coordinators.discard(self.instance_id)
-        # If this was the last updated ID, reset it
-        if CryptoDataCoordinator._last_updated_id == self.instance_id:
-            CryptoDataCoordinator._last_updated_id = None
+    @property
+    def fetcher(self):
+        """Return the shared markets fetcher."""
+        return self.hass.data[DOMAIN].fetcher
 
-    async def _async_update_data(self):
-        """Fetch data from API endpoint with coordinated timing."""
-        current_time = datetime.now()
+    @callback
+    def async_add_value_sensor(self, sensor: "CryptoinfoSensor") -> CALLBACK_TYPE:
+        """Compute the value of a price sensor on every update."""
+        self._value_sensors.append(sensor)
+        sensor.value = self._sensor_value(sensor)
+        return lambda: self._value_sensors.remove(sensor)
 
-        # If this is the first ever request, fetch data immediately
-        if CryptoDataCoordinator._last_update_time is None:
-            CryptoDataCoordinator._last_update_time = current_time
-            CryptoDataCoordinator._last_updated_id = self.instance_id
+    def _sensor_value(self, sensor: "CryptoinfoSensor"):
+        """Return the multiplied price of a sensor, rounded to its precision."""
+        quote = self.quote(sensor.cryptocurrency_id, sensor.currency_name)
+        if quote is None or quote.current_price is None:
+            return None
+        value = float(quote.current_price) * sensor.multiplier_value
+        # Keep integer display when there are no decimals (or precision=0).
+        if sensor.api_precision == "0":
+            return int(round(value))
+        if sensor.api_precision == "" and value.is_integer():
+            return int(value)
+        return value
 
-            _LOGGER.debug(
-                f"First request, fetching data for sensor: {self.id_name} instance_id: {self.instance_id} cryptocurrency_ids: {self.cryptocurrency_ids}"
-            )
+    def history_key(self, cryptocurrency_id: str) -> str:
+        """Return the key of the price history of a coin in the store."""
+        return f"{self.currency_name.lower()}/{cryptocurrency_id}"
 
-            url = self._markets_url()
+    @property
+    def history_span(self) -> float:
+        """Return the seconds of updates the price histories can hold."""
+        size = max((history.size for history in self.history.values()), default=0)
+        return size * self.update_frequency.total_seconds()
 
-            try:
-                session = aiohttp_client.async_get_clientsession(self.hass)
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    return {coin["id"]: coin for coin in data}
-            except (ClientError, TimeoutError, ValueError) as err:
-                _LOGGER.error("Error fetching data: %s", err)
-                return None
+    async def async_load_history(self) -> None:
+        """Restore the price histories from the store."""
+        store = self.hass.data[DOMAIN].store
+        since = time.time() - self.history_span
+        for coin_id in self.history:
+            samples = await store.async_get_history(self.history_key(coin_id), since)
+            self.replace_history(coin_id, samples)
 
-        time_since_last_request = current_time - CryptoDataCoordinator._last_update_time
+    def replace_history(
+        self, cryptocurrency_id: str, samples: list[tuple[float, float]]
+    ) -> None:
+        """Rebuild the price history of a coin from stored samples.
 
-        if (
-            time_since_last_request + timedelta(seconds=1)
-            < self.min_time_between_requests
+        The samples are resampled to one per update, and samples recorded
+        after the newest stored one are kept.
+        """
+        history = PriceHistory(self.statistics_windows)
+        for timestamp, price in resample(
+            samples, self.update_frequency.total_seconds()
         ):
-            _LOGGER.debug(
-                f"Not enough time has passed {self.instance_id} {self.min_time_between_requests} "
-                f"waiting for time between requests {time_since_last_request} frequency:{self.update_frequency}"
+            history.append(timestamp, price)
+        last = history.last_timestamp or 0.0
+        for timestamp, price in self.history[cryptocurrency_id].samples():
+            if timestamp > last:
+                history.append(timestamp, price)
+        self.history[cryptocurrency_id] = history
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Prepare the new data once before notifying the sensors.
+
+        Applies the streamed prices, records new prices in the history and
+        computes the values of all price sensors, so the sensors only
+        compare and write their state.
+        """
+        if self.top_count:
+            self._update_ranking()
+        if self.stream_prices and self.data:
+            self._apply_stream_prices()
+        self.stale = self.fetcher.is_stale(self)
+        for sensor in self._value_sensors:
+            sensor.value = self._sensor_value(sensor)
+        fetched_at = self.fetcher.fetched_at(self)
+        if fetched_at != self._fetched_at:
+            self._fetched_at = fetched_at
+            self.last_update = (
+                dt_util.as_local(fetched_at).strftime("%d-%m-%Y %H:%M")
+                if fetched_at
+                else None
             )
-            return self.data or None
+        if self.history and not self.stale:
+            self._record_history()
+        if self.portfolio_key is not None:
+            self.update_portfolio()
+        if self.alerts is not None and not self.stale:
+            self._check_alerts()
+        super().async_update_listeners()
 
-        # Find the next active coordinator ID
-        last_id = CryptoDataCoordinator._last_updated_id
-        _LOGGER.debug(
-            f"Last id {last_id}, Active coordinators: {sorted(CryptoDataCoordinator._active_coordinators)}"
-        )
+    @callback
+    def set_ranking_listener(
+        self, listener: Callable[[list[str], list[str]], None]
+    ) -> None:
+        """Call a listener with the coins that entered and left the top."""
+        self._ranking_listener = listener
+        self._ranked = self.cryptocurrency_id_list
+        listener(list(self._ranked), [])
 
-        if last_id is None or last_id not in CryptoDataCoordinator._active_coordinators:
-            should_update = self.instance_id == min(
-                CryptoDataCoordinator._active_coordinators
+    def _take_ranking(self, data: dict | None) -> None:
+        """Take the ids of a top mode coordinator from the fetched ranking."""
+        if not data:
+            return
+        ranking = list(data)
+        previous = self.cryptocurrency_id_list
+        if ranking == previous:
+            return
+        self.cryptocurrency_id_list = ranking
+        if self.extra_currencies and set(ranking) != set(previous):
+            # Ask the /simple/price group for the new ids
+            self.fetcher.subscribe(self)
+
+    def _update_ranking(self) -> None:
+        """Tell the ranking listener which coins entered and left the top."""
+        self._take_ranking(self.data)
+        ranking = self.cryptocurrency_id_list
+        previous = self._ranked
+        if ranking == previous:
+            return
+        self._ranked = ranking
+        current = set(ranking)
+        removed = [coin_id for coin_id in previous if coin_id not in current]
+        previous = set(previous)
+        added = [coin_id for coin_id in ranking if coin_id not in previous]
+        if (added or removed) and self._ranking_listener is not None:
+            self._ranking_listener(added, removed)
+
+    def set_alerts(self, alerts: PriceAlerts, key: str) -> None:
+        """Check price alerts on every update, continuing from the stored state."""
+        alerts.restore(self.hass.data[DOMAIN].store.get_alert_state(key))
+        self.alerts = alerts
+        self.alerts_key = key
+
+    def _check_alerts(self) -> None:
+        """Fire an event for every alert threshold the new prices crossed."""
+        for event in self.alerts.update(self.data or {}, time.time()):
+            _LOGGER.debug(f"Price alert of {self.id_name}: {event}")
+            self.hass.bus.async_fire(
+                EVENT_THRESHOLD_CROSSED,
+                {"id": self.id_name, "currency_name": self.currency_name, **event},
+            )
+        if self.alerts.changed:
+            self.hass.data[DOMAIN].store.set_alert_state(
+                self.alerts_key, self.alerts.as_dict()
+            )
+
+    def update_portfolio(self) -> None:
+        """Hand the value of the holdings in every currency to the portfolio."""
+        holdings = {}
+        for currency_name in [self.currency_name, *self.extra_currencies]:
+            currency = currency_name.lower()
+            for coin_id, multiplier in self.holdings.items():
+                quote = self.quote(coin_id, currency_name)
+                if quote is None or quote.current_price is None:
+                    continue
+                value = float(quote.current_price) * multiplier
+                holdings[(coin_id, currency)] = (
+                    value,
+                    change_amount(value, quote.change_24h),
+                )
+        self.hass.data[DOMAIN].portfolio.async_update(self.portfolio_key, holdings)
+
+    def _record_history(self) -> None:
+        """Append every quote that was not recorded yet to its history.
+
+        Streamed prices change more often than the update interval, so at
+        most one sample per update interval is recorded.
+        """
+        now = time.time()
+        spacing = self.update_frequency.total_seconds() * 0.9
+        samples = {}
+        for coin_id, history in self.history.items():
+            quote = (self.data or {}).get(coin_id)
+            if (
+                quote is None
+                or quote.current_price is None
+                or quote is self._recorded.get(coin_id)
+            ):
+                continue
+            last = history.last_timestamp
+            if last is not None and now - last < spacing:
+                continue
+            self._recorded[coin_id] = quote
+            history.append(now, float(quote.current_price))
+            samples[self.history_key(coin_id)] = [(now, float(quote.current_price))]
+        if samples:
+            self.hass.async_create_task(
+                self.hass.data[DOMAIN].store.async_append_history(samples)
             )
-        else:
-            # Get sorted list of active coordinators
-            active_ids = sorted(CryptoDataCoordinator._active_coordinators)
-            current_index = active_ids.index(last_id)
-            next_index = (current_index + 1) % len(active_ids)
-            next_id = active_ids[next_index]
-            should_update = self.instance_id == next_id
-            _LOGGER.debug(f"next_id {next_id}")
-
-        if not should_update:
-            _LOGGER.debug(f"Coordinator {self.instance_id} waiting for turn")
-            return self.data or None
 
+    def create_ticker_stream(self, provider: TickerProvider) -> TickerStream | None:
+        """Create a ticker stream for the coins in the base currency.
+
+        The trading pairs are made from the coin symbols in the market data,
+        or in the coin catalog before the first fetch.
+        """
+        catalog = self.hass.data[DOMAIN].catalog
+        pairs = {}
+        for coin_id in self.cryptocurrency_id_list:
+            quote = (self.data or {}).get(coin_id)
+            symbol = quote.symbol if quote and quote.symbol else None
+            if symbol is None and coin_id in catalog:
+                symbol = catalog.get(coin_id)[0]
+            if symbol:
+                pairs[provider.pair(symbol, self.currency_name)] = coin_id
+        if not pairs:
+            return None
+        self.ticker_stream = TickerStream(
+            self.hass,
+            provider,
+            pairs,
+            self.async_set_stream_prices,
+            self.async_clear_stream_prices,
+        )
+        return self.ticker_stream
+
+    @callback
+    def async_set_stream_prices(self, prices: dict[str, float]) -> None:
+        """Handle throttled prices from the ticker stream."""
+        self.stream_prices.update(prices)
+        self.async_update_listeners()
+
+    @callback
+    def async_clear_stream_prices(self) -> None:
+        """Go back to the polled prices after the stream disconnected."""
+        if not self.stream_prices:
+            return
+        self.stream_prices = {}
+        # The streamed prices were merged into the data, so restore the
+        # last polled data, or poll again if there is none
+        polled = self.fetcher.cached(self)
+        if polled is None:
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+        self.data = polled
+        self.async_update_listeners()
+
+    def _apply_stream_prices(self) -> None:
+        """Replace the prices in the market data with the streamed prices."""
+        data = self.data
+        for coin_id, price in self.stream_prices.items():
+            quote = data.get(coin_id)
+            if quote is not None and quote.current_price != price:
+                data[coin_id] = quote.replace(current_price=price)
+
+    def quote(self, cryptocurrency_id: str, currency_name: str) -> MarketQuote | None:
+        """Return the market data of a coin in one of the currencies."""
+        if currency_name == self.currency_name:
+            return (self.data or {}).get(cryptocurrency_id)
+        return self.currency_data.get(currency_name, {}).get(cryptocurrency_id)
+
+    def set_prices(self, prices: dict, base: dict | None) -> None:
+        """Build the market data in the extra currencies from /simple/price."""
+        base = base or {}
+        self.currency_data = {
+            currency: {
+                coin_id: MarketQuote.from_simple_price(
+                    base.get(coin_id), coin_id, values, currency
+                )
+                for coin_id, values in prices.items()
+            }
+            for currency in self.extra_currencies
+        }
+
+    @callback
+    def async_set_prices(self, prices: dict) -> None:
+        """Handle prices fetched for another entry and notify the sensors."""
+        self.set_prices(prices, self.data)
+        self.async_update_listeners()
+
+    async def _async_update_data(self):
+        """Fetch data from API endpoint, waiting for a slot in the rate limiter."""
         _LOGGER.debug(
-            f"Fetch data from API endpoint, sensor: {self.id_name} instance_id: {self.instance_id} cryptocurrency_ids: {self.cryptocurrency_ids}"
+            f"Fetch data from API endpoint, sensor: {self.id_name} cryptocurrency_ids: {self.cryptocurrency_ids} "
+            f"rate limiters: {self.fetcher.providers.rate_limiter_stats()}"
         )
 
-        url = self._markets_url()
+        started = time.monotonic()
+        data = await self.fetcher.async_fetch(self)
+        self.metrics.updates += 1
+        if data is None:
+            self.metrics.skipped_updates += 1
+            data = self.data or None
+        elif self.adaptive_interval is not None and self.fetcher.requested(self):
+            # Only learn from data fetched for this update, cached or
+            # coalesced data would look like an unchanged poll
+            self.update_interval = timedelta(
+                seconds=self.adaptive_interval.observe(data, time.time())
+            )
 
-        try:
-            session = aiohttp_client.async_get_clientsession(self.hass)
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
+        if self.extra_currencies:
+            if self.top_count:
+                # Price the coins of the new ranking
+                self._take_ranking(data)
+            prices = await self.fetcher.async_fetch_prices(self)
+            if prices is not None:
+                self.set_prices(prices, data)
 
-                # Update the last update time and ID only after successful request
-                CryptoDataCoordinator._last_update_time = current_time
-                CryptoDataCoordinator._last_updated_id = self.instance_id
+        self.metrics.update_latency.observe(time.monotonic() - started)
+        return data
 
-                return {coin["id"]: coin for coin in data}
-        except (ClientError, TimeoutError, ValueError) as err:
-            _LOGGER.error("Error fetching data: %s", err)
-            return self.data or None
+    def diagnostic_value(self, metric: str):
+        """Return the current value of a diagnostic sensor metric."""
+        fetcher = self.fetcher
+        if metric == "update_latency":
+            return round(self.metrics.update_latency.average * 1000)
+        if metric == "requests":
+            return fetcher.metrics.requests
+        if metric == "rate_limited":
+            return fetcher.providers.rate_limited_count
+        if metric == "cache_hit_ratio":
+            cache = fetcher.http_cache
+            lookups = cache.hits + cache.misses
+            hits = cache.hits + cache.not_modified
+            return round(hits / lookups * 100, 1) if lookups else None
+        if metric == "entity_writes":
+            return self.metrics.entity_writes
+        if metric == "update_interval":
+            return round(self.update_interval.total_seconds())
+        return None
 
 
 class CryptoinfoSensor(CoordinatorEntity[CryptoDataCoordinator], SensorEntity):
@@ -278,13 +758,23 @@ class CryptoinfoSensor(CoordinatorEntity[CryptoDataCoordinator], SensorEntity):
         multiplier: str,
         id_name: str,
         precision: str,
+        price_threshold: tuple[float, bool] = (0.0, False),
     ):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self.cryptocurrency_id = cryptocurrency_id
         self.currency_name = currency_name
         self.multiplier = multiplier
-        self._api_precision = precision
+        # Parsed once, the coordinator computes the value on every update
+        self.multiplier_value = float(multiplier)
+        self.api_precision = precision
+        self.value = None
+        self._price_threshold = price_threshold
+        self._written_value = None
+        self._fingerprint = None
+        self._fingerprint_quote = None
+        self._quote_fingerprint = None
+        self._attributes = None
         # MONETARY + MEASUREMENT is invalid in Home Assistant; spot price is a measurement.
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = unit_of_measurement or None
@@ -302,35 +792,43 @@ class CryptoinfoSensor(CoordinatorEntity[CryptoDataCoordinator], SensorEntity):
             + currency_name
         )
 
+    @property
+    def _quote(self) -> MarketQuote | None:
+        """Return the market data of the coin in the currency of the sensor."""
+        return self.coordinator.quote(self.cryptocurrency_id, self.currency_name)
+
+    async def async_added_to_hass(self) -> None:
+        """Register the sensor for the value pass of the coordinator."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_value_sensor(self))
+
+    async def async_update(self) -> None:
+        """Refresh on request, batched with the other requests of the moment."""
+        await self.hass.data[DOMAIN].refresher.async_refresh([self.coordinator])
+
     @property
     def native_value(self):
         """Return the native value of the sensor."""
-        if self.coordinator.data and self.cryptocurrency_id in self.coordinator.data:
-            value = float(
-                self.coordinator.data[self.cryptocurrency_id]["current_price"]
-            ) * float(self.multiplier)
-            # Keep integer display when there are no decimals (or precision=0).
-            if self._api_precision == "0":
-                return int(round(value))
-            if self._api_precision == "" and value.is_integer():
-                return int(value)
-            return value
-        return None
+        return self.value
 
     @property
     def extra_state_attributes(self):
-        """Return the state attributes."""
-        if (
-            not self.coordinator.data
-            or self.cryptocurrency_id not in self.coordinator.data
-        ):
+        """Return the state attributes, built once per coordinator update."""
+        if self._attributes is None:
+            self._attributes = self._build_attributes()
+        return self._attributes
+
+    def _build_attributes(self) -> dict:
+        """Build the state attributes from the market data."""
+        quote = self._quote
+        if quote is None:
             return {
-                ATTR_LAST_UPDATE: datetime.today().strftime("%d-%m-%Y %H:%M"),
+                ATTR_LAST_UPDATE: self.coordinator.last_update,
                 ATTR_CRYPTOCURRENCY_NAME: None,
                 ATTR_CURRENCY_NAME: None,
                 ATTR_BASE_PRICE: None,
                 ATTR_MULTIPLIER: None,
-                ATTR_PRECISION: self._api_precision or None,
+                ATTR_PRECISION: self.api_precision or None,
                 ATTR_24H_VOLUME: None,
                 ATTR_1H_CHANGE: None,
                 ATTR_24H_CHANGE: None,
@@ -348,35 +846,246 @@ class CryptoinfoSensor(CoordinatorEntity[CryptoDataCoordinator], SensorEntity):
                 ATTR_IMAGE: None,
             }
 
-        data = self.coordinator.data[self.cryptocurrency_id]
         return {
-            ATTR_LAST_UPDATE: datetime.today().strftime("%d-%m-%Y %H:%M"),
+            ATTR_LAST_UPDATE: self.coordinator.last_update,
             ATTR_CRYPTOCURRENCY_ID: self.cryptocurrency_id,
-            ATTR_CRYPTOCURRENCY_NAME: data["name"],
-            ATTR_CRYPTOCURRENCY_SYMBOL: data["symbol"],
+            ATTR_CRYPTOCURRENCY_NAME: quote.name,
+            ATTR_CRYPTOCURRENCY_SYMBOL: quote.symbol,
             ATTR_CURRENCY_NAME: self.currency_name,
-            ATTR_BASE_PRICE: data["current_price"],
+            ATTR_BASE_PRICE: quote.current_price,
             ATTR_MULTIPLIER: self.multiplier,
-            ATTR_PRECISION: self._api_precision or None,
-            ATTR_24H_VOLUME: data["total_volume"],
-            ATTR_1H_CHANGE: data["price_change_percentage_1h_in_currency"],
-            ATTR_24H_CHANGE: data["price_change_percentage_24h_in_currency"],
-            ATTR_7D_CHANGE: data["price_change_percentage_7d_in_currency"],
-            ATTR_14D_CHANGE: data["price_change_percentage_14d_in_currency"],
-            ATTR_30D_CHANGE: data["price_change_percentage_30d_in_currency"],
-            ATTR_1Y_CHANGE: data["price_change_percentage_1y_in_currency"],
-            ATTR_MARKET_CAP: data["market_cap"],
-            ATTR_CIRCULATING_SUPPLY: data["circulating_supply"],
-            ATTR_TOTAL_SUPPLY: data["total_supply"],
-            ATTR_ATH: data.get("ath"),
-            ATTR_ATH_DATE: data.get("ath_date"),
-            ATTR_ATH_CHANGE: data.get("ath_change_percentage"),
-            ATTR_RANK: data.get("market_cap_rank"),
-            ATTR_IMAGE: data["image"],
+            ATTR_PRECISION: self.api_precision or None,
+            ATTR_24H_VOLUME: quote.total_volume,
+            ATTR_1H_CHANGE: quote.change_1h,
+            ATTR_24H_CHANGE: quote.change_24h,
+            ATTR_7D_CHANGE: quote.change_7d,
+            ATTR_14D_CHANGE: quote.change_14d,
+            ATTR_30D_CHANGE: quote.change_30d,
+            ATTR_1Y_CHANGE: quote.change_1y,
+            ATTR_MARKET_CAP: quote.market_cap,
+            ATTR_CIRCULATING_SUPPLY: quote.circulating_supply,
+            ATTR_TOTAL_SUPPLY: quote.total_supply,
+            ATTR_ATH: quote.ath,
+            ATTR_ATH_DATE: quote.ath_date,
+            ATTR_ATH_CHANGE: quote.ath_change,
+            ATTR_RANK: quote.rank,
+            ATTR_IMAGE: quote.image,
+            ATTR_STALE: self.coordinator.stale,
         }
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Handle removal from Home Assistant."""
-        if isinstance(self.coordinator, CryptoDataCoordinator):
-            await self.coordinator.async_will_remove_from_hass()
-        await super().async_will_remove_from_hass()
+    def _value_changed(self, value) -> bool:
+        """Return True if the value moved at least the price threshold."""
+        last = self._written_value
+        threshold, percent = self._price_threshold
+        if value is None or last is None or not threshold:
+            return value != last
+        if percent:
+            if last == 0:
+                return value != last
+            return abs(value - last) / abs(last) * 100 >= threshold
+        return abs(value - last) >= threshold
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the value or the attributes changed.
+
+        With a price threshold, the fields that move with the price only
+        cause a write when the value moved at least the threshold.
+        """
+        self._attributes = None
+        quote = self._quote
+        if quote is None and self.coordinator.top_count:
+            # The coin left the top and the sensor is being removed
+            return
+        if quote is not self._fingerprint_quote:
+            # Cached and revalidated data reuse the same record
+            ignored = (
+                FAST_FIELDS
+                if self._price_threshold[0]
+                else {"current_price", "last_updated"}
+            )
+            self._fingerprint_quote = quote
+            self._quote_fingerprint = (
+                tuple(
+                    getattr(quote, field)
+                    for field in quote.__slots__
+                    if field not in ignored
+                )
+                if quote
+                else None
+            )
+        fingerprint = (
+            self.available,
+            self.coordinator.stale,
+            self._quote_fingerprint,
+        )
+        value = self.value
+        if fingerprint == self._fingerprint and not self._value_changed(value):
+            self.coordinator.metrics.skipped_writes += 1
+            return
+        self.coordinator.metrics.entity_writes += 1
+        self._fingerprint = fingerprint
+        self._written_value = value
+        super()._handle_coordinator_update()
+
+
+class CryptoinfoStatisticSensor(CoordinatorEntity[CryptoDataCoordinator], SensorEntity):
+    """Representation of a rolling statistic of a Cryptoinfo price."""
+
+    def __init__(
+        self,
+        coordinator: CryptoDataCoordinator,
+        cryptocurrency_id: str,
+        currency_name: str,
+        unit_of_measurement: str,
+        id_name: str,
+        statistic_type: str,
+        window: int,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.cryptocurrency_id = cryptocurrency_id
+        self._statistic_type = statistic_type
+        self._window = window
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = (
+            "%" if statistic_type == "volatility" else unit_of_measurement or None
+        )
+        suffix = f"{statistic_type} {window}"
+        self._attr_name = (
+            f"{SENSOR_PREFIX}{id_name} {cryptocurrency_id} {currency_name} {suffix}"
+            if id_name
+            else f"{SENSOR_PREFIX}{cryptocurrency_id} {currency_name} {suffix}"
+        )
+        self._attr_icon = "mdi:chart-line"
+        self._attr_unique_id = (
+            SENSOR_PREFIX
+            + (id_name + " " if len(id_name) > 0 else "")
+            + cryptocurrency_id
+            + currency_name
+            + " "
+            + suffix
+        )
+
+    @property
+    def native_value(self):
+        """Return the statistic over the window."""
+        history = self.coordinator.history.get(self.cryptocurrency_id)
+        if history is None:
+            return None
+        return getattr(history.windows[self._window], self._statistic_type)
+
+
+class CryptoinfoDiagnosticSensor(
+    CoordinatorEntity[CryptoDataCoordinator], SensorEntity
+):
+    """Representation of a performance metric of a Cryptoinfo entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: CryptoDataCoordinator,
+        entry_id: str,
+        id_name: str,
+        metric: str,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._metric = metric
+        label = metric.replace("_", " ")
+        self._attr_name = (
+            f"{SENSOR_PREFIX}{id_name} {label}"
+            if id_name
+            else f"{SENSOR_PREFIX}{label}"
+        )
+        self._attr_icon = "mdi:speedometer"
+        self._attr_unique_id = f"{SENSOR_PREFIX}{entry_id} {metric}"
+        self._attr_native_unit_of_measurement = DIAGNOSTIC_METRICS[metric]
+        self._attr_state_class = (
+            SensorStateClass.MEASUREMENT
+            if metric in ("update_latency", "cache_hit_ratio", "update_interval")
+            else SensorStateClass.TOTAL_INCREASING
+        )
+
+    @property
+    def native_value(self):
+        """Return the current value of the metric."""
+        return self.coordinator.diagnostic_value(self._metric)
+
+
+class CryptoinfoPortfolioSensor(SensorEntity):
+    """Representation of the holdings of all Cryptoinfo entries in a currency."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        portfolio: Portfolio,
+        currency_name: str,
+        unit_of_measurement: str,
+        change: bool,
+    ):
+        """Initialize the sensor, the total value or its 24h change."""
+        self._portfolio = portfolio
+        self._currency_name = currency_name
+        self._change = change
+        suffix = " 24h change" if change else ""
+        self._attr_name = f"{SENSOR_PREFIX}portfolio {currency_name}{suffix}"
+        self._attr_unique_id = f"{SENSOR_PREFIX}portfolio {currency_name}{suffix}"
+        self._attr_icon = "mdi:chart-line-variant" if change else "mdi:wallet"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = unit_of_measurement or None
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state when the totals of the currency changed."""
+        self.async_on_remove(
+            self._portfolio.async_add_listener(
+                self._currency_name, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def native_value(self):
+        """Return the total value or 24h change of the holdings."""
+        totals = self._portfolio.totals.get(self._currency_name)
+        if totals is None or not totals.holdings:
+            return None
+        return totals.change if self._change else totals.value
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of holdings and the 24h change percentage."""
+        totals = self._portfolio.totals.get(self._currency_name)
+        if totals is None:
+            return None
+        return {
+            ATTR_HOLDINGS: totals.holdings,
+            ATTR_24H_CHANGE: totals.change_percentage,
+        }
+
+
+class CryptoinfoSensorRecorderFriendly(CryptoinfoSensor):
+    """Cryptoinfo price sensor that keeps static attributes out of the recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_LAST_UPDATE,
+            ATTR_CRYPTOCURRENCY_ID,
+            ATTR_CRYPTOCURRENCY_NAME,
+            ATTR_CRYPTOCURRENCY_SYMBOL,
+            ATTR_CURRENCY_NAME,
+            ATTR_MULTIPLIER,
+            ATTR_PRECISION,
+            ATTR_24H_VOLUME,
+            ATTR_MARKET_CAP,
+            ATTR_CIRCULATING_SUPPLY,
+            ATTR_TOTAL_SUPPLY,
+            ATTR_ATH,
+            ATTR_ATH_DATE,
+            ATTR_ATH_CHANGE,
+            ATTR_RANK,
+            ATTR_IMAGE,
+            ATTR_STALE,
+        }
+    )
@@ -0,0 +1,47 @@
+"""Services for Cryptoinfo."""
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import config_validation as cv
+
+from .const.const import CONF_CRYPTOCURRENCY_IDS, DOMAIN
+
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(CONF_CRYPTOCURRENCY_IDS): vol.All(
+            cv.ensure_list_csv, [vol.All(cv.string, vol.Lower)]
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Cryptoinfo services."""
+
+    async def async_refresh(call: ServiceCall) -> None:
+        """Refresh the entries of some entry ids or coins, or all entries."""
+        data = hass.data.get(DOMAIN)
+        if data is None:
+            return
+        entry_ids = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        coin_ids = set(call.data.get(CONF_CRYPTOCURRENCY_IDS, []))
+        coordinators = [
+            coordinator
+            for entry_id, coordinator in data.coordinators.items()
+            if (entry_ids is None or entry_id in entry_ids)
+            and (
+                not coin_ids
+                or not coin_ids.isdisjoint(coordinator.cryptocurrency_id_list)
+            )
+        ]
+        if coordinators:
+            await data.refresher.async_refresh(coordinators)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA
+    )
@@ -0,0 +1,63 @@
+"""Fixtures for the CryptoInfo tests."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.cryptoinfo.const.const import DOMAIN
+from custom_components.cryptoinfo.helper.crypto_info_data import CryptoInfoData
+from homeassistant.core import HomeAssistant
+
+from .fake_coingecko import FakeCoinGecko, FakeProvider
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the option for the load test report."""
+    parser.addoption(
+        "--load-report",
+        default=None,
+        help="write the load test results as JSON to this file",
+    )
+
+
+@pytest.fixture(scope="session")
+def load_report(
+    request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory
+):
+    """Collect the load test results and write them as JSON at the end."""
+    report: dict[str, dict] = {}
+    yield report
+    if not report:
+        return
+    path = Path(
+        request.config.getoption("--load-report")
+        or tmp_path_factory.getbasetemp() / "load_report.json"
+    )
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integrations in all tests."""
+    yield
+
+
+@pytest.fixture
+async def coingecko():
+    """Return a running FakeCoinGecko."""
+    fake = FakeCoinGecko()
+    await fake.start()
+    yield fake
+    await fake.close()
+
+
+@pytest.fixture
+def crypto_data(hass: HomeAssistant, coingecko: FakeCoinGecko) -> CryptoInfoData:
+    """Return the shared CryptoInfo data, sending the requests to the fake API."""
+    data = hass.data[DOMAIN] = CryptoInfoData(hass)
+    data.rate_limiter.interval = 0.0
+    data.providers.providers = [
+        FakeProvider(coingecko.url, data.rate_limiter, data.circuit_breaker)
+    ]
+    return data
@@ -0,0 +1,137 @@
+"""Local stand-in for the CoinGecko API."""
+
+import asyncio
+from collections import deque
+import hashlib
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.cryptoinfo.helper.backoff import CircuitBreaker
+from custom_components.cryptoinfo.helper.providers import PriceProvider
+from custom_components.cryptoinfo.helper.rate_limiter import RateLimiter
+
+
+class FakeCoinGecko:
+    """The CoinGecko endpoints of CryptoInfo on a local port.
+
+    Responses in `script` are answered first, one per request, as
+    (status, headers); after that every request is served normally. Every
+    response is delayed by `latency` seconds, with `etag` the markets
+    responses can be revalidated with a 304 and with `max_age` they may be
+    cached for that many seconds.
+    """
+
+    def __init__(self, coins: int = 2, latency: float = 0.0, etag: bool = False):
+        """Initialize the fake with a number of coins."""
+        self.coins = [
+            {"id": f"coin-{index}", "symbol": f"c{index}", "name": f"Coin {index}"}
+            for index in range(coins)
+        ]
+        self.latency = latency
+        self.etag = etag
+        self.max_age = 0
+        self.price = 100.0
+        self.script: deque[tuple[int, dict[str, str]]] = deque()
+        self.requests: list[str] = []
+        app = web.Application()
+        app.router.add_get("/coins/list", self._coins_list)
+        app.router.add_get("/coins/markets", self._coins_markets)
+        app.router.add_get("/simple/price", self._simple_price)
+        self.server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the API."""
+        return f"http://{self.server.host}:{self.server.port}"
+
+    async def start(self) -> None:
+        """Start serving."""
+        await self.server.start_server()
+
+    async def close(self) -> None:
+        """Stop serving."""
+        await self.server.close()
+
+    def requests_to(self, path: str) -> list[str]:
+        """Return the requests to one endpoint."""
+        return [request for request in self.requests if request.startswith(path)]
+
+    async def _scripted(self, request: web.Request) -> web.Response | None:
+        self.requests.append(request.path_qs)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not self.script:
+            return None
+        status, headers = self.script.popleft()
+        return web.Response(status=status, headers=headers)
+
+    def _ids(self, request: web.Request) -> set[str]:
+        return set(request.query.get("ids", "").split(","))
+
+    def _market(self, coin: dict) -> dict:
+        return {
+            **coin,
+            "current_price": self.price,
+            "total_volume": 1000.0,
+            "price_change_percentage_24h_in_currency": 1.5,
+            "market_cap": 1000000.0,
+            "last_updated": "2024-01-01T00:00:00.000Z",
+        }
+
+    async def _coins_list(self, request: web.Request) -> web.Response:
+        return await self._scripted(request) or web.json_response(self.coins)
+
+    async def _coins_markets(self, request: web.Request) -> web.Response:
+        scripted = await self._scripted(request)
+        if scripted is not None:
+            return scripted
+        if "ids" in request.query:
+            ids = self._ids(request)
+            coins = [coin for coin in self.coins if coin["id"] in ids]
+        else:
+            # The top coins, ranked in the order of `coins`
+            coins = self.coins[: int(request.query.get("per_page", 100))]
+        body = json.dumps([self._market(coin) for coin in coins])
+        headers = {}
+        if self.max_age:
+            headers["Cache-Control"] = f"max-age={self.max_age}"
+        if self.etag:
+            headers["ETag"] = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=304, headers=headers)
+        return web.Response(text=body, content_type="application/json", headers=headers)
+
+    async def _simple_price(self, request: web.Request) -> web.Response:
+        scripted = await self._scripted(request)
+        if scripted is not None:
+            return scripted
+        currencies = request.query.get("vs_currencies", "").split(",")
+        return web.json_response(
+            {
+                coin["id"]: {currency: self.price / 2 for currency in currencies}
+                for coin in self.coins
+                if coin["id"] in self._ids(request)
+            }
+        )
+
+
+class FakeProvider(PriceProvider):
+    """Provider that sends the requests to a FakeCoinGecko."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        url: str,
+        rate_limiter: RateLimiter,
+        circuit_breaker: CircuitBreaker,
+    ):
+        """Initialize the provider."""
+        super().__init__(rate_limiter, circuit_breaker)
+        self.base_url = url
+
+    def url(self, path: str) -> str:
+        """Return the absolute URL of a path with query."""
+        return f"{self.base_url}/{path}"
@@ -0,0 +1,172 @@
+"""Tests for the backoff and circuit breaker of the CryptoInfo requests."""
+
+import asyncio
+
+from custom_components.cryptoinfo.helper.backoff import (
+    CircuitBreaker,
+    parse_retry_after,
+)
+from custom_components.cryptoinfo.helper.markets_fetcher import CryptoMarketsFetcher
+from custom_components.cryptoinfo.helper.providers import ProviderPool
+from custom_components.cryptoinfo.helper.rate_limiter import RateLimiter
+from custom_components.cryptoinfo.helper.storage_helper import CryptoInfoStore
+from homeassistant.core import HomeAssistant
+
+from .fake_coingecko import FakeCoinGecko, FakeProvider
+
+
+def _fetcher(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, interval: float = 0.0
+) -> CryptoMarketsFetcher:
+    provider = FakeProvider(
+        coingecko.url, RateLimiter(interval), CircuitBreaker(0.2, 0.4)
+    )
+    return CryptoMarketsFetcher(hass, ProviderPool([provider]), CryptoInfoStore(hass))
+
+
+def test_parse_retry_after() -> None:
+    """Test the delays asked for by the response headers."""
+    assert parse_retry_after({"Retry-After": "12"}) == 12.0
+    assert parse_retry_after({"Retry-After": "-3"}) == 0.0
+    assert parse_retry_after({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"})
+    assert (
+        parse_retry_after({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "7"})
+        is None
+    )
+    assert parse_retry_after({}) is None
+
+
+async def test_retry_timeline(hass: HomeAssistant, coingecko: FakeCoinGecko) -> None:
+    """Test that 429 and 5xx responses open the circuit until it may retry."""
+    fetcher = _fetcher(hass, coingecko)
+    breaker = fetcher.providers.providers[0].circuit_breaker
+    coingecko.script.extend([(429, {"Retry-After": "0.3"}), (503, {})])
+
+    assert await fetcher.async_fetch_coin_list() is None
+    assert breaker.state == breaker.OPEN
+    assert breaker.rate_limited_count == 1
+    assert breaker.retry_in > 0.2
+
+    # No requests go out while the circuit is open
+    assert await fetcher.async_fetch_coin_list() is None
+    assert len(coingecko.requests) == 1
+    assert fetcher.metrics.skipped == 1
+
+    # The trial request fails, the circuit opens again
+    await asyncio.sleep(breaker.retry_in + 0.05)
+    assert breaker.state == breaker.HALF_OPEN
+    assert await fetcher.async_fetch_coin_list() is None
+    assert breaker.state == breaker.OPEN
+    assert breaker.rate_limited_count == 1
+    assert len(coingecko.requests) == 2
+
+    # The next trial request succeeds and closes the circuit
+    await asyncio.sleep(breaker.retry_in + 0.05)
+    coins = await fetcher.async_fetch_coin_list()
+    assert coins == [("coin-0", "c0", "Coin 0"), ("coin-1", "c1", "Coin 1")]
+    assert breaker.state == breaker.CLOSED
+    assert len(coingecko.requests) == 3
+    assert fetcher.metrics.failures == 2
+
+
+async def test_client_error_keeps_provider_healthy(
+    hass: HomeAssistant, coingecko: FakeCoinGecko
+) -> None:
+    """Test that a 4xx response other than 429 is not a provider failure."""
+    fetcher = _fetcher(hass, coingecko)
+    provider = fetcher.providers.providers[0]
+    coingecko.script.append((404, {}))
+
+    assert await fetcher.async_fetch_coin_list() is None
+    assert provider.circuit_breaker.state == provider.circuit_breaker.CLOSED
+    assert provider.health.errors == 0
+    assert provider.health.error_rate == 0.0
+    assert fetcher.metrics.failures == 1
+
+
+async def test_client_error_keeps_backoff(
+    hass: HomeAssistant, coingecko: FakeCoinGecko
+) -> None:
+    """Test that a 4xx response leaves a Retry-After hold and a half open circuit."""
+    fetcher = _fetcher(hass, coingecko)
+    provider = fetcher.providers.providers[0]
+    provider.circuit_breaker = breaker = CircuitBreaker(0.0, 0.0)
+    coingecko.latency = 0.1
+    coingecko.script.extend([(404, {}), (503, {}), (404, {})])
+
+    # Another response asks to hold off while the request is in flight
+    request = asyncio.ensure_future(fetcher.async_fetch_coin_list())
+    await asyncio.sleep(0.05)
+    breaker.record_success(30)
+    assert await request is None
+    assert breaker.state == breaker.OPEN
+
+    breaker.record_success()
+    assert await fetcher.async_fetch_coin_list() is None
+    assert breaker.state == breaker.HALF_OPEN
+    # The trial request fails with a client error, the next one may try again
+    assert await fetcher.async_fetch_coin_list() is None
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.trial_running
+    assert await fetcher.async_fetch_coin_list() is not None
+    assert breaker.state == breaker.CLOSED
+
+
+async def test_queued_requests_wait_for_circuit(
+    hass: HomeAssistant, coingecko: FakeCoinGecko
+) -> None:
+    """Test that requests waiting for the rate limiter are not sent after a 429."""
+    fetcher = _fetcher(hass, coingecko, interval=0.1)
+    breaker = fetcher.providers.providers[0].circuit_breaker
+    coingecko.script.append((429, {"Retry-After": "5"}))
+
+    results = await asyncio.gather(*(fetcher.async_fetch_coin_list() for _ in range(3)))
+
+    assert results == [None, None, None]
+    assert len(coingecko.requests) == 1
+    assert breaker.state == breaker.OPEN
+    assert breaker.rate_limited_count == 1
+    assert fetcher.metrics.skipped == 2
+
+
+async def test_cancelled_request_keeps_trial(
+    hass: HomeAssistant, coingecko: FakeCoinGecko
+) -> None:
+    """Test that cancelling another request doesn't end the trial request."""
+    fetcher = _fetcher(hass, coingecko, interval=0.2)
+    provider = fetcher.providers.providers[0]
+    provider.circuit_breaker = breaker = CircuitBreaker(0.0, 0.0)
+    coingecko.script.append((503, {}))
+
+    failing = asyncio.ensure_future(fetcher.async_fetch_coin_list())
+    queued = asyncio.ensure_future(fetcher.async_fetch_coin_list())
+    assert await failing is None
+    assert breaker.state == breaker.HALF_OPEN
+    trial = asyncio.ensure_future(fetcher.async_fetch_coin_list())
+    await asyncio.sleep(0)
+    assert breaker.trial_running
+
+    queued.cancel()
+    await asyncio.sleep(0)
+    assert breaker.trial_running
+
+    assert await trial
+    assert breaker.state == breaker.CLOSED
+    assert len(coingecko.requests) == 2
+
+
+def test_queued_trial_request() -> None:
+    """Test which queued requests may be sent after the circuit changed."""
+    breaker = CircuitBreaker(0.0, 0.0)
+    breaker.record_failure(5.0)
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow_queued_request(False)
+
+    # Without a delay the circuit is half open right away
+    breaker.record_failure()
+    assert breaker.state == breaker.HALF_OPEN
+    # A queued request becomes the trial request, the next one waits for it
+    assert breaker.allow_queued_request(False)
+    assert breaker.trial_running
+    assert not breaker.allow_queued_request(False)
+    assert breaker.allow_queued_request(True)
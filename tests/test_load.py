@@ -0,0 +1,152 @@
+"""Load test of many CryptoInfo entries against the local CoinGecko stand-in."""
+
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.cryptoinfo.const.const import (
+    CONF_CRYPTOCURRENCY_IDS,
+    CONF_CURRENCY_NAME,
+    CONF_ID,
+    CONF_MULTIPLIERS,
+    CONF_UNIT_OF_MEASUREMENT,
+    CONF_UPDATE_FREQUENCY,
+    DOMAIN,
+)
+from custom_components.cryptoinfo.helper.crypto_info_data import CryptoInfoData
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .fake_coingecko import FakeCoinGecko
+
+COINS = 50
+TICKS = 3
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    return sorted(values)[min(len(values) - 1, len(values) * percent // 100)]
+
+
+@pytest.mark.parametrize("entries", [1, 10, 100, 1000])
+async def test_load(
+    hass: HomeAssistant,
+    coingecko: FakeCoinGecko,
+    crypto_data: CryptoInfoData,
+    load_report: dict,
+    entries: int,
+) -> None:
+    """Run update ticks of many entries and report their cost.
+
+    Every tick refreshes all coordinators like their timers do. The report
+    has the requests, the wall and event loop (thread CPU) time per tick,
+    the staleness per entry (the time from the start of the tick until its
+    sensor wrote the new price) and the memory of the entries.
+    """
+    coingecko.coins = [
+        {"id": f"coin-{index}", "symbol": f"c{index}", "name": f"Coin {index}"}
+        for index in range(COINS)
+    ]
+    coingecko.latency = 0.01
+    tracemalloc.start()
+    try:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        config_entries = []
+        for index in range(entries):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                unique_id=f"entry {index}",
+                data={
+                    CONF_ID: f"entry {index}",
+                    CONF_CRYPTOCURRENCY_IDS: f"coin-{index % COINS}",
+                    CONF_MULTIPLIERS: "1",
+                    CONF_CURRENCY_NAME: ("usd", "eur")[index % 2],
+                    CONF_UNIT_OF_MEASUREMENT: "",
+                    CONF_UPDATE_FREQUENCY: 1,
+                },
+            )
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            config_entries.append(entry)
+        await hass.async_block_till_done()
+        memory_entries = tracemalloc.get_traced_memory()[0] - memory_before
+
+        registry = er.async_get(hass)
+        entity_ids = {
+            entry.entry_id: [
+                registry_entry.entity_id
+                for registry_entry in er.async_entries_for_config_entry(
+                    registry, entry.entry_id
+                )
+            ]
+            for entry in config_entries
+        }
+        assert all(entity_ids.values())
+
+        written: dict[str, float] = {}
+
+        @callback
+        def state_written(event: Event) -> None:
+            written.setdefault(event.data["entity_id"], time.monotonic())
+
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, state_written)
+        coordinators = list(crypto_data.coordinators.values())
+        ticks = []
+        for tick in range(TICKS):
+            price = 100.5 + tick
+            coingecko.price = price
+            written.clear()
+            requests = len(coingecko.requests)
+            started = time.monotonic()
+            cpu_started = time.thread_time()
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+            await hass.async_block_till_done()
+            wall = time.monotonic() - started
+            cpu = time.thread_time() - cpu_started
+
+            staleness = [
+                max(written[entity_id] for entity_id in ids) - started
+                for ids in entity_ids.values()
+                if all(entity_id in written for entity_id in ids)
+            ]
+            assert len(staleness) == entries
+            assert len(coingecko.requests) - requests == min(entries, 2)
+            for ids in entity_ids.values():
+                assert all(
+                    float(hass.states.get(entity_id).state) == price
+                    for entity_id in ids
+                )
+            ticks.append(
+                {
+                    "requests": len(coingecko.requests) - requests,
+                    "wall_seconds": wall,
+                    "loop_cpu_seconds": cpu,
+                    "staleness_mean": statistics.fmean(staleness),
+                    "staleness_p95": _percentile(staleness, 95),
+                    "staleness_max": max(staleness),
+                }
+            )
+        unsub()
+        memory_current, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    for entry in config_entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    load_report[f"entries_{entries}"] = {
+        "entries": entries,
+        "setup_requests": len(coingecko.requests) - sum(t["requests"] for t in ticks),
+        "requests_per_minute": statistics.fmean(t["requests"] for t in ticks),
+        "memory_per_entry_bytes": memory_entries / entries,
+        "memory_current_bytes": memory_current - memory_before,
+        "memory_peak_bytes": memory_peak - memory_before,
+        "ticks": ticks,
+    }
@@ -0,0 +1,171 @@
+"""Tests for the shared markets fetcher of CryptoInfo."""
+
+import asyncio
+from datetime import timedelta
+
+from custom_components.cryptoinfo.helper.crypto_info_data import CryptoInfoData
+from custom_components.cryptoinfo.sensor import CryptoDataCoordinator
+from homeassistant.core import HomeAssistant
+
+from .fake_coingecko import FakeCoinGecko
+
+
+def _coordinator(
+    hass: HomeAssistant,
+    crypto_data: CryptoInfoData,
+    cryptocurrency_ids: str,
+    currency_name: str = "usd",
+    extra_currencies: list[str] | None = None,
+) -> CryptoDataCoordinator:
+    coordinator = CryptoDataCoordinator(
+        hass,
+        cryptocurrency_ids,
+        currency_name,
+        timedelta(minutes=1),
+        cryptocurrency_ids,
+        "",
+        extra_currencies,
+    )
+    crypto_data.fetcher.subscribe(coordinator)
+    return coordinator
+
+
+async def test_entries_share_one_request(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that entries in the same currency are served by one request."""
+    first = _coordinator(hass, crypto_data, "coin-0")
+    second = _coordinator(hass, crypto_data, "coin-1")
+    other = _coordinator(hass, crypto_data, "coin-0", "eur")
+
+    await asyncio.gather(
+        first.async_refresh(), second.async_refresh(), other.async_refresh()
+    )
+
+    requests = coingecko.requests_to("/coins/markets")
+    assert len(requests) == 2
+    assert any("ids=coin-0,coin-1" in request for request in requests)
+    assert list(first.data) == ["coin-0"]
+    assert list(second.data) == ["coin-1"]
+    assert list(other.data) == ["coin-0"]
+    assert crypto_data.fetcher.metrics.coalesced == 1
+
+
+async def test_extra_currencies(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that the extra currencies are priced with /simple/price."""
+    coordinator = _coordinator(hass, crypto_data, "coin-0,coin-1", "usd", ["eur"])
+
+    await coordinator.async_refresh()
+
+    assert len(coingecko.requests_to("/simple/price")) == 1
+    assert coordinator.quote("coin-1", "usd").current_price == 100.0
+    assert coordinator.quote("coin-1", "eur").current_price == 50.0
+
+
+async def test_top_extra_currencies(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that the coins of a new top ranking are priced in the same update."""
+    coordinator = CryptoDataCoordinator(
+        hass, "", "usd", timedelta(minutes=1), "top", "", ["eur"], None, 1
+    )
+    crypto_data.fetcher.subscribe(coordinator)
+
+    await coordinator.async_refresh()
+
+    assert coordinator.cryptocurrency_id_list == ["coin-0"]
+    assert coordinator.quote("coin-0", "eur").current_price == 50.0
+    assert not coordinator.stale
+
+    coingecko.coins.reverse()
+    await coordinator.async_refresh()
+
+    assert coordinator.cryptocurrency_id_list == ["coin-1"]
+    assert coordinator.quote("coin-1", "eur").current_price == 50.0
+    assert not coordinator.stale
+    assert coingecko.requests_to("/simple/price")[-1].count("coin-") == 1
+
+
+async def test_adaptive_interval_observes_requests(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that only data requested for an update adapts the interval."""
+    first, second = coordinators = [
+        CryptoDataCoordinator(
+            hass,
+            coin_id,
+            "usd",
+            timedelta(minutes=1),
+            coin_id,
+            "",
+            None,
+            None,
+            0,
+            (1, 10),
+        )
+        for coin_id in ("coin-0", "coin-1")
+    ]
+    for coordinator in coordinators:
+        crypto_data.fetcher.subscribe(coordinator)
+
+    # The first entry requests, the data of the second one is coalesced
+    for _ in range(2):
+        await asyncio.gather(first.async_refresh(), second.async_refresh())
+    assert crypto_data.fetcher.metrics.coalesced == 2
+    # The fake API returns the same `last_updated` every time
+    assert first.adaptive_interval.unchanged_polls == 1
+    assert second.adaptive_interval.unchanged_polls == 0
+
+    coingecko.max_age = 60
+    await first.async_refresh()
+    await first.async_refresh()
+    assert crypto_data.fetcher.http_cache.hits == 1
+    assert len(coingecko.requests_to("/coins/markets")) == 3
+    assert first.adaptive_interval.unchanged_polls == 2
+
+
+async def test_not_modified(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that a 304 response reuses the cached data."""
+    coingecko.etag = True
+    coordinator = _coordinator(hass, crypto_data, "coin-0")
+
+    await coordinator.async_refresh()
+    data = coordinator.data
+    await coordinator.async_refresh()
+
+    assert len(coingecko.requests_to("/coins/markets")) == 2
+    assert crypto_data.fetcher.http_cache.not_modified == 1
+    assert coordinator.data["coin-0"] is data["coin-0"]
+
+    coingecko.price = 110.0
+    await coordinator.async_refresh()
+
+    assert crypto_data.fetcher.http_cache.not_modified == 1
+    assert coordinator.data["coin-0"].current_price == 110.0
+
+
+async def test_rate_limited_keeps_stale_data(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that the sensors keep the cached data while the API rate limits."""
+    coordinator = _coordinator(hass, crypto_data, "coin-0")
+    await coordinator.async_refresh()
+    coingecko.script.append((429, {"Retry-After": "60"}))
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.stale
+    assert coordinator.data["coin-0"].current_price == 100.0
+    assert crypto_data.circuit_breaker.state == crypto_data.circuit_breaker.OPEN
+
+    # No requests while the circuit is open
+    await coordinator.async_refresh()
+
+    assert len(coingecko.requests_to("/coins/markets")) == 2
+    assert crypto_data.fetcher.metrics.skipped == 1
+    assert coordinator.metrics.skipped_updates == 2
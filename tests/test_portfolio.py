@@ -0,0 +1,97 @@
+"""Tests for the portfolio totals of CryptoInfo."""
+
+from datetime import timedelta
+import random
+
+import pytest
+
+from custom_components.cryptoinfo.helper.crypto_info_data import CryptoInfoData
+from custom_components.cryptoinfo.helper.market_quote import MarketQuote
+from custom_components.cryptoinfo.helper.portfolio import change_amount
+from custom_components.cryptoinfo.sensor import CryptoDataCoordinator
+from homeassistant.core import HomeAssistant
+
+COINS = ["coin-0", "coin-1", "coin-2", "coin-3"]
+
+
+def _coordinator(hass: HomeAssistant, index: int) -> CryptoDataCoordinator:
+    coordinator = CryptoDataCoordinator(
+        hass,
+        ",".join(COINS),
+        "usd",
+        timedelta(minutes=1),
+        f"entry {index}",
+        "",
+        ["eur"],
+    )
+    coordinator.holdings = {coin_id: index + 0.5 for coin_id in COINS[index % 2 :]}
+    coordinator.portfolio_key = f"entry-{index}"
+    return coordinator
+
+
+def _random_quotes(rng: random.Random) -> dict[str, MarketQuote]:
+    """Return quotes with some coins missing and some prices None."""
+    quotes = {}
+    for coin_id in COINS:
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        quotes[coin_id] = MarketQuote(
+            current_price=None if roll < 0.3 else rng.uniform(0.01, 1000.0),
+            change_24h=None if rng.random() < 0.2 else rng.uniform(-99.0, 200.0),
+        )
+    return quotes
+
+
+def _recompute(
+    coordinators: list[CryptoDataCoordinator],
+) -> dict[str, tuple[float, float, int]]:
+    """Return the value, change and number of holdings per currency."""
+    totals: dict[str, tuple[float, float, int]] = {}
+    for coordinator in coordinators:
+        for currency in ["usd", "eur"]:
+            for coin_id, multiplier in coordinator.holdings.items():
+                quote = coordinator.quote(coin_id, currency)
+                if quote is None or quote.current_price is None:
+                    continue
+                value = quote.current_price * multiplier
+                total = totals.get(currency, (0.0, 0.0, 0))
+                totals[currency] = (
+                    total[0] + value,
+                    total[1] + change_amount(value, quote.change_24h),
+                    total[2] + 1,
+                )
+    return totals
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+async def test_totals_match_recompute(
+    hass: HomeAssistant, crypto_data: CryptoInfoData, seed: int
+) -> None:
+    """Test that the incremental totals equal a full recompute."""
+    rng = random.Random(seed)
+    portfolio = crypto_data.portfolio
+    coordinators = [_coordinator(hass, index) for index in range(3)]
+    active = list(coordinators)
+
+    for _ in range(200):
+        coordinator = rng.choice(coordinators)
+        if coordinator in active and rng.random() < 0.05:
+            portfolio.async_remove_entry(coordinator.portfolio_key)
+            active.remove(coordinator)
+        else:
+            coordinator.data = _random_quotes(rng)
+            coordinator.currency_data = {"eur": _random_quotes(rng)}
+            coordinator.update_portfolio()
+            if coordinator not in active:
+                active.append(coordinator)
+
+        expected = _recompute(active)
+        for currency in ["usd", "eur"]:
+            totals = portfolio.totals.get(currency)
+            value, change, holdings = expected.get(currency, (0.0, 0.0, 0))
+            assert (totals.holdings if totals else 0) == holdings
+            if totals is None:
+                continue
+            assert totals.value == pytest.approx(value, rel=1e-9, abs=1e-6)
+            assert totals.change == pytest.approx(change, rel=1e-9, abs=1e-6)
@@ -0,0 +1,102 @@
+"""Tests for the price alerts of CryptoInfo."""
+
+from custom_components.cryptoinfo.helper.market_quote import MarketQuote
+from custom_components.cryptoinfo.helper.price_alerts import (
+    ALERT_COOLDOWN,
+    ALERT_HYSTERESIS,
+    PriceAlerts,
+    ThresholdSet,
+)
+
+
+def test_crossings_in_price_order() -> None:
+    """Test that the crossed thresholds are found and ordered along the move."""
+    thresholds = ThresholdSet([300, 100, 400, 200], ALERT_HYSTERESIS, True)
+
+    assert thresholds.update(150, 0) == []
+    assert thresholds.update(350, ALERT_COOLDOWN) == [(200, "up"), (300, "up")]
+    # 200 and 300 are crossed again while disarmed, 100 through the bisect
+    assert thresholds.update(50, 2 * ALERT_COOLDOWN) == [
+        (300, "down"),
+        (200, "down"),
+        (100, "down"),
+    ]
+    assert thresholds.update(450, 3 * ALERT_COOLDOWN) == [
+        (100, "up"),
+        (200, "up"),
+        (300, "up"),
+        (400, "up"),
+    ]
+    assert thresholds.update(460, 4 * ALERT_COOLDOWN) == []
+
+
+def test_hysteresis() -> None:
+    """Test that jitter around a threshold crosses it once."""
+    thresholds = ThresholdSet([100], ALERT_HYSTERESIS, True)
+    assert thresholds.band(100) == 0.5
+
+    thresholds.update(99, 0)
+    assert thresholds.update(100, ALERT_COOLDOWN) == [(100, "up")]
+    assert thresholds.update(99.8, 2 * ALERT_COOLDOWN) == []
+    assert thresholds.update(100.2, 3 * ALERT_COOLDOWN) == []
+    assert thresholds.update(99.4, 4 * ALERT_COOLDOWN) == [(100, "down")]
+    assert thresholds.update(100.6, 5 * ALERT_COOLDOWN) == [(100, "up")]
+
+
+def test_hysteresis_in_points() -> None:
+    """Test that the band of 24h changes is in points."""
+    thresholds = ThresholdSet([-10, 10], ALERT_HYSTERESIS, False)
+    assert thresholds.band(10) == thresholds.band(-10) == ALERT_HYSTERESIS
+
+    thresholds.update(0, 0)
+    assert thresholds.update(-10.2, ALERT_COOLDOWN) == [(-10, "down")]
+    assert thresholds.update(-9.8, 2 * ALERT_COOLDOWN) == []
+    assert thresholds.update(-9.4, 3 * ALERT_COOLDOWN) == [(-10, "up")]
+
+
+def test_cooldown() -> None:
+    """Test that a threshold fires at most once per cooldown."""
+    thresholds = ThresholdSet([100], ALERT_HYSTERESIS, True)
+
+    thresholds.update(99, 0)
+    assert thresholds.update(101, 0) == [(100, "up")]
+    assert thresholds.update(99, 10) == []
+    assert thresholds.update(101, 20) == []
+    assert thresholds.update(99, ALERT_COOLDOWN) == [(100, "down")]
+
+
+def test_events_in_price_order() -> None:
+    """Test that several thresholds crossed in one update fire in price order."""
+    alerts = PriceAlerts({"bitcoin": ([40000, 50000, 60000], [5])})
+
+    assert alerts.update({"bitcoin": MarketQuote(current_price=55000)}, 0) == []
+    events = alerts.update(
+        {"bitcoin": MarketQuote(current_price=35000, change_24h=-7.5)}, 0
+    )
+
+    assert events == [
+        {
+            "cryptocurrency_id": "bitcoin",
+            "type": "price",
+            "threshold": 50000,
+            "direction": "down",
+            "value": 35000.0,
+        },
+        {
+            "cryptocurrency_id": "bitcoin",
+            "type": "price",
+            "threshold": 40000,
+            "direction": "down",
+            "value": 35000.0,
+        },
+    ]
+    events = alerts.update(
+        {"bitcoin": MarketQuote(current_price=65000, change_24h=7.5)}, ALERT_COOLDOWN
+    )
+    assert [(event["type"], event["threshold"]) for event in events] == [
+        ("price", 40000),
+        ("price", 50000),
+        ("price", 60000),
+        ("24h_change", -5),
+        ("24h_change", 5),
+    ]
@@ -0,0 +1,92 @@
+"""Tests for the price history of the CryptoInfo statistics."""
+
+import math
+import random
+import statistics
+
+import pytest
+
+from custom_components.cryptoinfo.helper.price_history import (
+    PriceHistory,
+    resample,
+)
+
+
+def test_resample_interpolates_sparse_samples() -> None:
+    """Test that hourly backfilled prices give one price per update."""
+    hourly = [(hour * 3600.0, 100.0 + hour) for hour in range(25)]
+
+    samples = resample(hourly, 60)
+
+    assert len(samples) == 24 * 60 + 1
+    assert samples[0] == (0.0, 100.0)
+    assert samples[30] == (1800.0, pytest.approx(100.5))
+    assert samples[-1] == (86400.0, 124.0)
+
+
+def test_resample_reduces_dense_samples() -> None:
+    """Test that prices closer than an update are reduced to one per update."""
+    dense = [(index * 300.0, float(index)) for index in range(25)]
+
+    assert resample(dense, 3600) == [(0.0, 0.0), (3600.0, 12.0), (7200.0, 24.0)]
+
+
+def test_resample_keeps_long_gaps() -> None:
+    """Test that an outage of days is not filled with interpolated prices."""
+    gap = 3 * 86400
+    samples = [(0.0, 1.0), (60.0, 2.0), (60.0 + gap, 3.0), (120.0 + gap, 4.0)]
+
+    assert resample(samples, 60) == samples
+
+
+def test_window_span_matches_live_updates() -> None:
+    """Test that a window over backfilled prices covers the time of live ones."""
+    history = PriceHistory([60])
+    for timestamp, price in resample([(0.0, 100.0), (7200.0, 220.0)], 60):
+        history.append(timestamp, price)
+
+    window = history.windows[60]
+    # The last 60 updates are the last hour, from 161 to 220
+    assert window.low == pytest.approx(161.0)
+    assert window.high == pytest.approx(220.0)
+    assert window.sma == pytest.approx(190.5)
+
+
+def _recompute(prices: list[float], size: int) -> dict[str, float | None]:
+    """Return the statistics of a window computed from all prices."""
+    window = prices[-size:]
+    ema = prices[0]
+    for price in prices[1:]:
+        ema += 2 / (size + 1) * (price - ema)
+    returns = [math.log(b / a) for a, b in zip(window, window[1:])]
+    return {
+        "sma": sum(window) / len(window),
+        "ema": ema,
+        "high": max(window),
+        "low": min(window),
+        "volatility": (statistics.stdev(returns) * 100 if len(returns) >= 2 else None),
+    }
+
+
+@pytest.mark.parametrize("size", [2, 5, 24])
+def test_rolling_windows_match_recompute(size: int) -> None:
+    """Test the O(1) window statistics against a recompute, past wrap-around."""
+    rng = random.Random(size)
+    history = PriceHistory([size], size=size + 1)
+    prices = []
+    price = 100.0
+    for step in range(10 * size + 7):
+        price *= math.exp(rng.gauss(0, 0.02))
+        prices.append(price)
+        history.append(step * 60.0, price)
+
+        window = history.windows[size]
+        expected = _recompute(prices, size)
+        assert window.sma == pytest.approx(expected["sma"])
+        assert window.ema == pytest.approx(expected["ema"])
+        assert window.high == expected["high"]
+        assert window.low == expected["low"]
+        if expected["volatility"] is None:
+            assert window.volatility is None
+        else:
+            assert window.volatility == pytest.approx(expected["volatility"])
@@ -0,0 +1,54 @@
+"""Tests for the rate limiter of the CryptoInfo requests."""
+
+import asyncio
+import time
+
+from custom_components.cryptoinfo.helper.rate_limiter import RateLimiter
+
+
+async def test_fifo_order() -> None:
+    """Test that waiting requests get their tokens in arrival order."""
+    limiter = RateLimiter(0.05)
+    acquired: list[tuple[int, float]] = []
+
+    async def request(number: int) -> None:
+        await limiter.acquire()
+        acquired.append((number, time.monotonic()))
+
+    await asyncio.gather(*(request(number) for number in range(4)))
+
+    assert [number for number, _ in acquired] == [0, 1, 2, 3]
+    for (_, previous), (_, current) in zip(acquired, acquired[1:]):
+        assert current - previous >= 0.04
+    assert limiter.stats["acquired"] == 4
+    assert limiter.queue_depth == 0
+
+
+async def test_burst_capacity() -> None:
+    """Test that a full bucket serves a burst without waiting."""
+    limiter = RateLimiter(0.05, capacity=3)
+
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+    assert time.monotonic() - started < 0.04
+
+    await limiter.acquire()
+    assert limiter.stats["max_wait"] >= 0.04
+
+
+async def test_cancelled_waiter() -> None:
+    """Test that a cancelled request does not take a token."""
+    limiter = RateLimiter(0.05)
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 0
+
+    started = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - started < 0.06
+    assert limiter.stats["acquired"] == 2
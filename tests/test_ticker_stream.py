@@ -0,0 +1,216 @@
+"""Tests for the exchange ticker streams of CryptoInfo."""
+
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+import json
+import time
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from custom_components.cryptoinfo.helper.crypto_info_data import CryptoInfoData
+from custom_components.cryptoinfo.helper.ticker_stream import (
+    BinanceProvider,
+    KrakenProvider,
+    TickerProvider,
+    TickerStream,
+)
+from custom_components.cryptoinfo.sensor import CryptoDataCoordinator
+from homeassistant.core import HomeAssistant
+
+from .fake_coingecko import FakeCoinGecko
+
+# Base reconnect delay, short enough for the tests
+BACKOFF = 0.1
+
+
+class FakeExchange:
+    """Websocket ticker feed on a local port.
+
+    Every connection is answered with the next list of frames in
+    `connections`; with `drop` the connection is closed after them, else
+    it stays open until the client closes it.
+    """
+
+    def __init__(self, connections: list[list[str]], drop: bool = False):
+        """Initialize the feed."""
+        self.connections = connections
+        self.drop = drop
+        self.subscriptions: list[dict] = []
+        self.connected_at: list[float] = []
+        app = web.Application()
+        app.router.add_get("/ws", self._websocket)
+        self.server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        """Return the websocket URL."""
+        return f"ws://{self.server.host}:{self.server.port}/ws"
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connected_at.append(time.monotonic())
+        self.subscriptions.append(await websocket.receive_json())
+        index = len(self.connected_at) - 1
+        for frame in self.connections[index] if index < len(self.connections) else []:
+            await websocket.send_str(frame)
+        if self.drop and index < len(self.connections) - 1:
+            # Give the client time to handle the frames before dropping
+            await asyncio.sleep(0.05)
+            await websocket.close()
+            return websocket
+        async for _ in websocket:
+            pass
+        return websocket
+
+
+async def _run_stream(
+    hass: HomeAssistant,
+    exchange: FakeExchange,
+    provider: TickerProvider,
+    pairs: dict[str, str],
+    duration: float,
+) -> tuple[TickerStream, list[dict[str, float]], list[None]]:
+    """Run a stream against the exchange and return what it handed out."""
+    writes: list[dict[str, float]] = []
+    disconnects: list[None] = []
+    await exchange.server.start_server()
+    provider.url = exchange.url
+    stream = TickerStream(
+        hass,
+        provider,
+        pairs,
+        writes.append,
+        lambda: disconnects.append(None),
+        throttle=0.01,
+    )
+    task = asyncio.ensure_future(stream.async_run())
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await exchange.server.close()
+    return stream, writes, disconnects
+
+
+def _binance(pair: str, price: float) -> str:
+    return json.dumps({"e": "24hrMiniTicker", "s": pair, "c": str(price)})
+
+
+def _kraken(pair: str, price) -> str:
+    return json.dumps(
+        {
+            "channel": "ticker",
+            "type": "update",
+            "data": [{"symbol": pair, "last": price}],
+        }
+    )
+
+
+async def test_ticks_coalesce(hass: HomeAssistant) -> None:
+    """Test that several ticks per coin are handed out as one update."""
+    exchange = FakeExchange(
+        [
+            [
+                _binance("BTCUSDT", 50000.0),
+                _binance("ETHUSDT", 3000.0),
+                _binance("BTCUSDT", 50010.0),
+                _binance("BTCUSDT", 50020.0),
+            ]
+        ]
+    )
+    provider = BinanceProvider()
+    pairs = {
+        provider.pair("btc", "usd"): "bitcoin",
+        provider.pair("eth", "usd"): "ethereum",
+    }
+
+    stream, writes, _ = await _run_stream(hass, exchange, provider, pairs, 0.2)
+
+    assert exchange.subscriptions == [
+        {
+            "method": "SUBSCRIBE",
+            "params": ["btcusdt@miniTicker", "ethusdt@miniTicker"],
+            "id": 1,
+        }
+    ]
+    assert writes == [{"bitcoin": 50020.0, "ethereum": 3000.0}]
+    assert stream.ticks == 4
+
+
+async def test_garbage_is_ignored(hass: HomeAssistant) -> None:
+    """Test that garbage, unknown channels and unknown pairs are ignored."""
+    exchange = FakeExchange(
+        [
+            [
+                "not json",
+                json.dumps(["a", "list"]),
+                json.dumps({"channel": "heartbeat"}),
+                json.dumps({"channel": "ticker", "data": [{"symbol": "BTC/USD"}]}),
+                _kraken("BTC/USD", "not a price"),
+                _kraken("DOGE/USD", 0.1),
+                _kraken("BTC/USD", 50000.0),
+            ]
+        ]
+    )
+    provider = KrakenProvider()
+
+    stream, writes, disconnects = await _run_stream(
+        hass, exchange, provider, {provider.pair("btc", "usd"): "bitcoin"}, 0.2
+    )
+
+    assert exchange.subscriptions[0]["params"]["symbol"] == ["BTC/USD"]
+    assert writes == [{"bitcoin": 50000.0}]
+    assert stream.ticks == 1
+    # The connection survived the garbage
+    assert len(exchange.connected_at) == 1
+    assert len(disconnects) == 1
+
+
+async def test_reconnect_with_backoff(hass: HomeAssistant) -> None:
+    """Test that a dropped stream reconnects after a backoff delay."""
+    exchange = FakeExchange(
+        [
+            [_binance("BTCUSDT", 50000.0)],
+            [_binance("BTCUSDT", 51000.0)],
+        ],
+        drop=True,
+    )
+    provider = BinanceProvider()
+
+    with patch(
+        "custom_components.cryptoinfo.helper.ticker_stream.RECONNECT_BASE", BACKOFF
+    ):
+        stream, writes, disconnects = await _run_stream(
+            hass, exchange, provider, {provider.pair("btc", "usd"): "bitcoin"}, 0.5
+        )
+
+    assert len(exchange.connected_at) == 2
+    # The jittered delay is at least half the base delay
+    gap = exchange.connected_at[1] - exchange.connected_at[0]
+    assert gap >= BACKOFF / 2
+    assert writes == [{"bitcoin": 50000.0}, {"bitcoin": 51000.0}]
+    assert len(disconnects) == 2
+    assert not stream.connected
+
+
+async def test_clear_stream_prices(
+    hass: HomeAssistant, coingecko: FakeCoinGecko, crypto_data: CryptoInfoData
+) -> None:
+    """Test that the polled prices come back when the stream disconnects."""
+    coordinator = CryptoDataCoordinator(
+        hass, "coin-0", "usd", timedelta(minutes=1), "coin-0", ""
+    )
+    coordinator.fetcher.subscribe(coordinator)
+    await coordinator.async_refresh()
+
+    coordinator.async_set_stream_prices({"coin-0": 123.0})
+    assert coordinator.data["coin-0"].current_price == 123.0
+
+    coordinator.async_clear_stream_prices()
+    assert coordinator.stream_prices == {}
+    assert coordinator.data["coin-0"].current_price == coingecko.price